@@ -1,10 +1,10 @@
+from array import array
 from collections import deque
 import random
-import numpy
 import networkx as nx
 import matplotlib.pyplot as plt
 
-from simulator import Network, Node
+from simulator import Network, Node, PortBackend, Scheduler
 
 from baseline.procedures import (
     fragment_broadcast,
@@ -49,29 +49,55 @@ from baseline.shared import Procedure, TransmissionRound, EdgeState, Stage, Flip
 
 
 class MSTNetwork(Network):
-    def __init__(self, verbose: bool = False, seed: int = None):
-        super().__init__(verbose)
+    def __init__(
+        self,
+        verbose: bool = False,
+        seed: int = None,
+        scheduler: Scheduler = Scheduler.SEQUENTIAL,
+        port_backend: PortBackend = PortBackend.DICT,
+        workers: int = None,
+        profile: bool = False,
+        trace: str = None,
+        attribute: bool = False,
+        count_messages: bool = True,
+    ):
+        super().__init__(
+            verbose, scheduler, port_backend, workers, profile, trace, attribute, count_messages
+        )
+
+        self.set_seed(seed)
+
+    def set_seed(self, seed: int = None):
+        # Coin flips are derived from this seed, see `shared.coin_flip`
+        self.seed = seed if seed is not None else random.getrandbits(64)
 
-        if seed is not None:
-            random.seed(seed)
-            numpy.random.seed(seed)
+        # Generator of the random graphs below, so that the global one is left alone
+        self.rng = random.Random(self.seed)
+
+    def reset(self, seed: int = None):
+        """
+        Restore the loaded graph to its state before the first round, to run it again.
+        :param seed: The seed of the coin flips of the next run, drawn at random if not given.
+        """
+        super().reset()
+        self.set_seed(seed)
 
     def initalize_random_diameter_3_network(self, n: int):
         G = None
 
         while True:
             # Randomly sample p between 0 and 1
-            p = random.uniform(0, 1)
+            p = self.rng.uniform(0, 1)
 
             # Generate a random graph with sampled p
-            G = nx.fast_gnp_random_graph(n, p)
+            G = nx.fast_gnp_random_graph(n, p, seed=self.rng)
 
             if not nx.is_connected(G):
                 continue
 
             if nx.diameter(G) == 3:
                 edges = list(G.edges())
-                random_weights = random.sample(
+                random_weights = self.rng.sample(
                     range(1, len(edges) + 100), len(edges)
                 )  # Generate distinct weights
                 weighted_edges = [
@@ -87,14 +113,14 @@ class MSTNetwork(Network):
         connected = False
 
         while not connected:
-            m = random.randint(n - 1, int(((n * (n - 1)) / 2)))
-            G = nx.gnm_random_graph(n, m)
+            m = self.rng.randint(n - 1, int(((n * (n - 1)) / 2)))
+            G = nx.gnm_random_graph(n, m, seed=self.rng)
 
             if nx.is_connected(G):
                 connected = True
 
         # Assign unique random weights to edges
-        unique_weights = random.sample(
+        unique_weights = self.rng.sample(
             range(1, G.number_of_edges() + 100), G.number_of_edges()
         )
         for i, (u, v) in enumerate(G.edges()):
@@ -102,41 +128,37 @@ class MSTNetwork(Network):
 
         self.load_networkx_graph(G)
 
-    def load_networkx_graph(self, G: nx.Graph):
-        # Create a mapping of networkx nodes to ExampleNode instances
-        id_to_node = {}
-
-        n = G.number_of_nodes()
-
-        # Create ExampleNode objects for each node in the networkx graph
-        for node_id in G.nodes:
-            node = MSTNode(
-                node_id,
-                i=0,
-                n=n,
-                fragment_id=node_id,
-                root=True,
-                verbose=self.verbose,
-            )
-            id_to_node[node_id] = node
+    @classmethod
+    def from_networkx(cls, G: nx.Graph, **kwargs):
+        network = cls(**kwargs)
+        network.load_networkx_graph(G)
+        return network
+
+    def create_node(self, node_id, n: int):
+        return MSTNode(
+            node_id,
+            i=0,
+            n=n,
+            fragment_id=node_id,
+            root=True,
+            verbose=self.verbose,
+        )
+
+    def load_edge_arrays(self, src, dst, weight, node_ids=None):
+        super().load_edge_arrays(src, dst, weight, node_ids, state=EdgeState.BASIC)
 
-        # Add nodes to the Network
-        for node in id_to_node.values():
-            self.add_node(node)
+    def load_networkx_graph(self, G: nx.Graph):
+        src, dst, weight = [], [], []
 
-        # Add edges to the Network
         for node1_id, node2_id, edge_data in G.edges(data=True):
             if "weight" not in edge_data:
                 raise KeyError("The 'weight' key is missing from edge_data")
 
-            weight = edge_data["weight"]
+            src.append(node1_id)
+            dst.append(node2_id)
+            weight.append(edge_data["weight"])
 
-            self.add_edge(
-                id_to_node[node1_id],
-                id_to_node[node2_id],
-                weight=weight,
-                state=EdgeState.BASIC,
-            )
+        self.load_edge_arrays(src, dst, weight, node_ids=G.nodes)
 
     def to_networkx(self):
         nx_graph = nx.Graph()
@@ -212,8 +234,120 @@ class MSTNetwork(Network):
     def get_max_awake_rounds(self):
         return max([node.awake_rounds for node in self.nodes])
 
+    def get_total_messages(self):
+        self.get_traffic()
+        return sum([node.messages_sent for node in self.nodes])
+
+    def get_total_message_bits(self):
+        self.get_traffic()
+        return sum([node.message_bits for node in self.nodes])
+
+    def get_max_edge_round_bits(self):
+        """Return the most bits sent in one direction of one edge in a single round."""
+        self.get_traffic()
+        return max([node.max_port_round_bits for node in self.nodes])
+
+    def get_messages_per_round(self):
+        """Return {round: (messages, bits)} for every round in which a message was sent."""
+        totals, _ = self.get_traffic().export()
+        for node in self.nodes:
+            if node.round_traffic is not None:
+                round_num, messages, bits = node.round_traffic
+                entry = totals.setdefault(round_num, [0, 0])
+                entry[0] += messages
+                entry[1] += bits
+
+        return {round_num: tuple(totals[round_num]) for round_num in sorted(totals)}
+
+    def get_messages_per_phase_stage(self):
+        """Return {(phase, stage): (messages, bits)}, in order of phase and stage."""
+        _, totals = self.get_traffic().export()
+        for node in self.nodes:
+            if node.stage_traffic is not None:
+                phase, stage, messages, bits = node.stage_traffic
+                entry = totals.setdefault((phase, stage), [0, 0])
+                entry[0] += messages
+                entry[1] += bits
+
+        order = list(Stage)
+        return {
+            key: tuple(totals[key])
+            for key in sorted(totals, key=lambda key: (key[0], order.index(key[1])))
+        }
+
+    def get_messages_per_stage(self):
+        """Return {stage: (messages, bits)} over all phases."""
+        totals = {}
+        for (_, stage), (messages, bits) in self.get_messages_per_phase_stage().items():
+            entry = totals.setdefault(stage, (0, 0))
+            totals[stage] = (entry[0] + messages, entry[1] + bits)
+        return totals
+
+    def get_messages_per_phase(self):
+        """Return {phase: (messages, bits)} over all stages."""
+        totals = {}
+        for (phase, _), (messages, bits) in self.get_messages_per_phase_stage().items():
+            entry = totals.setdefault(phase, (0, 0))
+            totals[phase] = (entry[0] + messages, entry[1] + bits)
+        return totals
+
+    def get_messages_per_edge(self):
+        """Return {(node ID, node ID): (messages, bits)} for every edge, counting both directions."""
+        self.get_traffic()
+        totals = {}
+        for node in self.nodes:
+            ports = node.port_traffic or ()
+            for port in range(len(ports) // 4):
+                messages, bits = ports[4 * port], ports[4 * port + 1]
+                if not messages:
+                    continue
+
+                neighbor = node.ports[port]["destination"]
+                key = tuple(sorted((node.node_id, neighbor.node_id)))
+                entry = totals.setdefault(key, (0, 0))
+                totals[key] = (entry[0] + messages, entry[1] + bits)
+        return totals
+
+    def get_max_message_bits(self):
+        self.get_traffic()
+        return max([node.max_message_bits for node in self.nodes])
+
 
 class MSTNode(Node):
+    __slots__ = (
+        "parent_port",
+        "child_ports",
+        "i",
+        "n",
+        "root",
+        "schedule",
+        "stage",
+        "fragment_id",
+        "phase",
+        "broadcast_message",
+        "upcast_value",
+        "neighbor_message",
+        "adjacent_message",
+        "received_neighbor_messages",
+        "fragment_flip",
+        "local_moe_port",
+        "is_fragment_moe",
+        "valid_moe",
+        "new_fragment_id",
+        "new_level_num",
+        "new_parent_port",
+        "new_child_ports",
+        "adjacent_moe",
+        "adjacent_flip",
+        "messages_sent",
+        "message_bits",
+        "max_message_bits",
+        "stage_traffic",
+        "round_traffic",
+        "port_traffic",
+        "max_port_round_bits",
+        "coin_flips",
+    )
 
     def __init__(
         self,
@@ -224,15 +358,24 @@ class MSTNode(Node):
         root: bool = False,
         verbose: bool = False,
     ):
+        self.n: int = n  # Total number of nodes
         super().__init__(node_id, verbose)
+
+        self.i = i
+        self.fragment_id = fragment_id
+        self.root = root
+
+    def reset(self):
+        """Restore the node to a single-node fragment of level 0, as created by `MSTNetwork`."""
+        super().reset()
         self.parent_port: int = None
         self.child_ports: list[int] = []
-        self.i: int = i  # Distance to the root
-        self.n: int = n  # Total number of nodes
-        self.root: bool = root  # Whether this node is the root
-        self.schedule = deque()  # Transmission schedule queue
+        self.i: int = 0  # Distance to the root
+        self.root: bool = True  # Whether this node is the root
+        self.schedule: deque = None  # Transmission schedule queue, created by each procedure
         self.stage: Stage = Stage.FIND_MOE
-        self.fragment_id = fragment_id
+        self.fragment_id = self.node_id
+        self.phase: int = 1
 
         # Procedure-specific fields
         self.broadcast_message = None  # Value being broadcasted
@@ -240,16 +383,8 @@ class MSTNode(Node):
         self.neighbor_message = None
         self.adjacent_message = None
 
-        self.procedures = {
-            Procedure.FRAGMENT_BROADCAST: self._fragment_broadcast_handler,
-            Procedure.UPCAST_MIN: self._upcast_min_handler,
-            Procedure.TRANSMIT_NEIGHBOR: self._transmit_neighbor_handler,
-            Procedure.TRANSMIT_ADJACENT: self._transmit_adjacent_handler,
-            Procedure.MERGE_UP: self._merge_up_handler,
-            Procedure.MERGE_DOWN: self._merge_down_handler,
-        }
-
-        self.received_neighbor_messages = {}  # Dictionary with ports as keys
+        # Containers below are created on first use
+        self.received_neighbor_messages: dict = None  # Dictionary with ports as keys
         self.fragment_flip: Flip = None
         self.local_moe_port: int = None  # Port ID of the local MOE
         self.is_fragment_moe: bool = False  # Boolean flag for fragment MOE
@@ -257,9 +392,20 @@ class MSTNode(Node):
         self.new_fragment_id: int = None
         self.new_level_num: int = None
         self.new_parent_port: int = None
-        self.new_child_ports: list[int] = []
-        self.adjacent_moe = {}
-        self.adjacent_flip = {}
+        self.new_child_ports: list[int] = None
+        self.adjacent_moe: dict = None
+        self.adjacent_flip: dict = None
+
+        # CONGEST accounting of the messages sent by this node
+        self.messages_sent: int = 0
+        self.message_bits: int = 0  # Total bits sent
+        self.max_message_bits: int = 0  # Size of the largest message sent
+        self.stage_traffic: list = None  # [phase, stage, messages, bits] of the last stage that sent
+        self.round_traffic: list = None  # [round, messages, bits] of the last round that sent
+        self.port_traffic: array = None  # Messages, bits, last round and bits in it, 4 slots per port
+        self.max_port_round_bits: int = 0  # Most bits sent through one port in one round
+
+        self.coin_flips: int = 0  # Number of coins flipped as a fragment root
 
     fragment_broadcast = fragment_broadcast
     _fragment_broadcast_handler = _fragment_broadcast_handler
@@ -274,6 +420,16 @@ class MSTNode(Node):
     merge_down = merge_down
     _merge_down_handler = _merge_down_handler
 
+    # Procedure handlers, shared by every node rather than bound per instance
+    PROCEDURES = {
+        Procedure.FRAGMENT_BROADCAST: _fragment_broadcast_handler,
+        Procedure.UPCAST_MIN: _upcast_min_handler,
+        Procedure.TRANSMIT_NEIGHBOR: _transmit_neighbor_handler,
+        Procedure.TRANSMIT_ADJACENT: _transmit_adjacent_handler,
+        Procedure.MERGE_UP: _merge_up_handler,
+        Procedure.MERGE_DOWN: _merge_down_handler,
+    }
+
     find_moe_entry = find_moe_entry
     upcast_moe_entry = upcast_moe_entry
     upcast_moe_exit = upcast_moe_exit
@@ -298,17 +454,71 @@ class MSTNode(Node):
 
     def print_state(self):
         """Print the current state of the node."""
+        if not self.verbose:
+            return
+
         self.logger.info("")
 
-        self.logger.info(f"  Parent Port: {self.parent_port}")
-        self.logger.info(f"  Child Ports: {self.child_ports}")
-        self.logger.info(f"  Distance to Root (i): {self.i}")
-        self.logger.info(f"  Root: {self.root}")
-        self.logger.info(f"  Fragment ID: {self.fragment_id}")
-        self.logger.info(f"  Edge State:")
+        self.logger.info("  Parent Port: %s", self.parent_port)
+        self.logger.info("  Child Ports: %s", self.child_ports)
+        self.logger.info("  Distance to Root (i): %s", self.i)
+        self.logger.info("  Root: %s", self.root)
+        self.logger.info("  Fragment ID: %s", self.fragment_id)
+        self.logger.info("  Edge State:")
         for port, attributes in self.ports.items():
             state = attributes.get("state")
-            self.logger.info(f"    Port: {port}, State: {state}")
+            self.logger.info("    Port: %s, State: %s", port, state)
+
+    def send_message(self, port_id: int, message):
+        """Send a typed message, recording its encoded size in bits per stage, port and round."""
+        super().send_message(port_id, message)
+
+        traffic = self.network.traffic
+        if traffic is None:
+            return
+
+        bits = message.bits()
+        self.messages_sent += 1
+        self.message_bits += bits
+        if bits > self.max_message_bits:
+            self.max_message_bits = bits
+
+        round_num = self.network.round_num
+
+        # Rounds are added to the network once the node sends in a later round
+        entry = self.round_traffic
+        if entry is not None and entry[0] == round_num:
+            entry[1] += 1
+            entry[2] += bits
+        else:
+            if entry is not None:
+                traffic.add(entry[0], entry[2], entry[1])
+            self.round_traffic = [round_num, 1, bits]
+
+        # A node goes through its stages in order, so stages are added the same way
+        entry = self.stage_traffic
+        if entry is not None and entry[1] is self.stage and entry[0] == self.phase:
+            entry[2] += 1
+            entry[3] += bits
+        else:
+            if entry is not None:
+                traffic.add_stage(entry[0], entry[1], entry[3], entry[2])
+            self.stage_traffic = [self.phase, self.stage, 1, bits]
+
+        # Rounds start at 1, so a port that never sent holds 0 as its last round
+        ports = self.port_traffic
+        if ports is None:
+            ports = self.port_traffic = array("q", [0]) * (4 * len(self.ports))
+        slot = 4 * port_id
+        ports[slot] += 1
+        ports[slot + 1] += bits
+        if ports[slot + 2] == round_num:
+            ports[slot + 3] += bits
+        else:
+            ports[slot + 2] = round_num
+            ports[slot + 3] = bits
+        if ports[slot + 3] > self.max_port_round_bits:
+            self.max_port_round_bits = ports[slot + 3]
 
     def handle_stage(
         self,
@@ -339,8 +549,9 @@ class MSTNode(Node):
             self.stage = next_stage
             return
 
-        if procedure in self.procedures:
-            self.procedures[procedure](phase)
+        handler = self.PROCEDURES.get(procedure)
+        if handler is not None:
+            handler(self, phase)
         else:
             self.logger.info("No handler for procedure %s.", procedure.value)
 
@@ -1,9 +1,9 @@
 from collections import deque
-from baseline.shared import Procedure, TransmissionRound
+from baseline.shared import MergeStateMessage, MessageType, Procedure, TransmissionRound
 
 
 def merge_up(self, start_round: int):
-    self.logger.info(f"initializing Merge Up starting at round {start_round}.")
+    self.logger.info("initializing Merge Up starting at round %s.", start_round)
 
     base = start_round - 1
 
@@ -38,7 +38,8 @@ def _merge_up_handler(self, phase: TransmissionRound):
     if phase == TransmissionRound.UP_RECEIVE:
         self.logger.info("UP_RECEIVE.")
         self.logger.info(
-            f"is trying to upcast {self.new_fragment_id, self.new_level_num}"
+            "is trying to upcast %s",
+            (self.new_fragment_id, self.new_level_num),
         )
     if phase == TransmissionRound.UP_SEND:
         # TODO: if v receives a non-empty NEW-LEVEL-NUM from its child, v sets its own NEW-LEVEL-NUM to the received value plus one.
@@ -48,10 +49,10 @@ def _merge_up_handler(self, phase: TransmissionRound):
         self.logger.info(self.inbox)
         if self.inbox:
             for port, message in self.inbox:
-                self.logger.info(f"Node {self.node_id}: message: {message}")
-                if message["new_level_num"] is not None:
-                    self.new_level_num = message["new_level_num"] + 1
-                    self.new_fragment_id = message["new_fragment_id"]
+                self.logger.info("Node %s: message: %s", self.node_id, message)
+                if message.new_level_num is not None:
+                    self.new_level_num = message.new_level_num + 1
+                    self.new_fragment_id = message.new_fragment_id
 
                     # If you receive this here the child received from is the new parent
                     # Old parent and any of the other children now become children
@@ -69,16 +70,17 @@ def _merge_up_handler(self, phase: TransmissionRound):
             self.inbox.clear()
 
         # sends up the value in its NEW-LEVEL-NUM and NEW-FRAGMENT-ID
-        message = {
-            "new_level_num": self.new_level_num,
-            "new_fragment_id": self.new_fragment_id,
-        }
+        message = MergeStateMessage(
+            MessageType.MERGE_STATE, self.new_level_num, self.new_fragment_id
+        )
 
-        self.logger.info(f"Node {self.node_id}: new state: {message}")
+        self.logger.info("Node %s: new state: %s", self.node_id, message)
 
         if self.parent_port is not None:
             self.send_message(self.parent_port, message)
 
             self.logger.info(
-                f"sent state {message} to parent via port {self.parent_port}."
+                "sent state %s to parent via port %s.",
+                message,
+                self.parent_port,
             )
@@ -8,7 +8,10 @@ def transmit_neighbor(self, start_round: int, message):
     :param start_round: The round to start the procedure.
     :param value: The value to be transmitted to neighbors.
     """
-    self.logger.info(f"initializing Transmit Neighbor starting at round {start_round}.")
+    self.logger.info(
+        "initializing Transmit Neighbor starting at round %s.",
+        start_round,
+    )
 
     self.neighbor_message = message  # Set the value to be transmitted
     base = start_round
@@ -52,13 +55,16 @@ def transmit_neighbor(self, start_round: int, message):
 
 def _transmit_neighbor_handler(self, phase: TransmissionRound):
     """Handle transmit-neighbor-specific behavior."""
+    if self.received_neighbor_messages is None:
+        self.received_neighbor_messages = {}
+
     if phase == TransmissionRound.DOWN_SEND:
         for (
             port,
             message,
         ) in self.inbox:  # Assuming inbox contains (port, message) pairs
             self.received_neighbor_messages[port] = message
-            self.logger.info(f"received {message} from port {port}.")
+            self.logger.info("received %s from port %s.", message, port)
 
         self.inbox.clear()
 
@@ -66,7 +72,9 @@ def _transmit_neighbor_handler(self, phase: TransmissionRound):
         for port in self.child_ports:
             self.send_message(port, self.neighbor_message)
             self.logger.info(
-                f"sent value {self.neighbor_message} to child via port {port}."
+                "sent value %s to child via port %s.",
+                self.neighbor_message,
+                port,
             )
     if phase == TransmissionRound.UP_SEND:
         for (
@@ -74,7 +82,7 @@ def _transmit_neighbor_handler(self, phase: TransmissionRound):
             message,
         ) in self.inbox:  # Assuming inbox contains (port, message) pairs
             self.received_neighbor_messages[port] = message
-            self.logger.info(f"received {message} from port {port}.")
+            self.logger.info("received %s from port %s.", message, port)
 
         self.inbox.clear()
 
@@ -82,7 +90,9 @@ def _transmit_neighbor_handler(self, phase: TransmissionRound):
         if self.parent_port is not None:
             self.send_message(self.parent_port, self.neighbor_message)
             self.logger.info(
-                f"sent value {self.neighbor_message} to parent via port {self.parent_port}."
+                "sent value %s to parent via port %s.",
+                self.neighbor_message,
+                self.parent_port,
             )
 
     if phase == TransmissionRound.DOWN_RECEIVE:
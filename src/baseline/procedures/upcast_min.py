@@ -1,5 +1,5 @@
 from collections import deque
-from baseline.shared import Procedure, TransmissionRound
+from baseline.shared import Message, MessageType, Procedure, TransmissionRound
 
 
 def upcast_min(self, start_round: int, value: int):
@@ -7,7 +7,7 @@ def upcast_min(self, start_round: int, value: int):
     Initialize the Upcast Min procedure.
     :param start_round: The round to start the procedure.
     """
-    self.logger.info(f"initializing Upcast Min starting at round {start_round}.")
+    self.logger.info("initializing Upcast Min starting at round %s.", start_round)
 
     self.upcast_value = value  # Set the value to be upcasted
     base = start_round - 1
@@ -37,30 +37,34 @@ def upcast_min(self, start_round: int, value: int):
 def _upcast_min_handler(self, phase: TransmissionRound):
     """Handle upcast-min-specific behavior."""
     if phase == TransmissionRound.UP_RECEIVE:
-        self.logger.info(f"UP_RECEIVE.")
-        self.logger.info(f"is trying to upcast {self.upcast_value}")
+        self.logger.info("UP_RECEIVE.")
+        self.logger.info("is trying to upcast %s", self.upcast_value)
     elif phase == TransmissionRound.UP_SEND:
-        self.logger.info(f"UP_SEND.")
+        self.logger.info("UP_SEND.")
         # compares the messages it previously received in its Up-Receive round to its current messagee, if any, and stores the minimum value
         if self.inbox:
-            # Extract all message values from the inbox
-            received_values = [float(message) for _, message in self.inbox]
-            # Find the smallest value
-            smallest_received = min(received_values)
+            # Find the smallest value received
+            smallest_received = min(message.value for _, message in self.inbox)
             self.upcast_value = min(smallest_received, self.upcast_value)
 
         self.inbox.clear()
 
         if self.root:
             self.logger.info(
-                f"Node {self.node_id}, upcasted minimum value: {self.upcast_value}"
+                "Node %s, upcasted minimum value: %s",
+                self.node_id,
+                self.upcast_value,
             )
 
         # transmits this minimum value to its parent in the tree
         elif self.parent_port is not None:
-            self.send_message(self.parent_port, str(self.upcast_value))
+            self.send_message(
+                self.parent_port, Message(MessageType.VALUE, self.upcast_value)
+            )
             self.logger.info(
-                f"sent value {self.upcast_value} to parent via port {self.parent_port}."
+                "sent value %s to parent via port %s.",
+                self.upcast_value,
+                self.parent_port,
             )
 
     elif phase == TransmissionRound.END:
@@ -69,13 +73,16 @@ def _upcast_min_handler(self, phase: TransmissionRound):
 
 def _transmit_neighbor_handler(self, phase: TransmissionRound):
     """Handle transmit-neighbor-specific behavior."""
+    if self.received_neighbor_messages is None:
+        self.received_neighbor_messages = {}
+
     if phase == TransmissionRound.DOWN_SEND:
         for (
             port,
             message,
         ) in self.inbox:  # Assuming inbox contains (port, message) pairs
             self.received_neighbor_messages[port] = message
-            self.logger.info(f"received {message} from port {port}.")
+            self.logger.info("received %s from port %s.", message, port)
 
         self.inbox.clear()
 
@@ -83,7 +90,9 @@ def _transmit_neighbor_handler(self, phase: TransmissionRound):
         for port in self.child_ports:
             self.send_message(port, self.neighbor_message)
             self.logger.info(
-                f"sent value {self.neighbor_message} to child via port {port}."
+                "sent value %s to child via port %s.",
+                self.neighbor_message,
+                port,
             )
     if phase == TransmissionRound.UP_SEND:
         for (
@@ -91,7 +100,7 @@ def _transmit_neighbor_handler(self, phase: TransmissionRound):
             message,
         ) in self.inbox:  # Assuming inbox contains (port, message) pairs
             self.received_neighbor_messages[port] = message
-            self.logger.info(f"received {message} from port {port}.")
+            self.logger.info("received %s from port %s.", message, port)
 
         self.inbox.clear()
 
@@ -99,7 +108,9 @@ def _transmit_neighbor_handler(self, phase: TransmissionRound):
         if self.parent_port is not None:
             self.send_message(self.parent_port, self.neighbor_message)
             self.logger.info(
-                f"sent value {self.neighbor_message} to parent via port {self.parent_port}."
+                "sent value %s to parent via port %s.",
+                self.neighbor_message,
+                self.parent_port,
             )
 
     if phase == TransmissionRound.DOWN_RECEIVE:
@@ -1,32 +1,35 @@
-from baseline.shared import Stage
+from baseline.shared import Message, MessageType, Stage, TERMINATE_MESSAGE
 
 
 def broadcast_moe_entry(self, round_number):
     if self.root:
         if self.upcast_value == float("inf"):
-            self.fragment_broadcast(round_number + 1, "TERMINATE")
+            self.fragment_broadcast(round_number + 1, TERMINATE_MESSAGE)
 
         else:
-            self.fragment_broadcast(round_number + 1, self.upcast_value)
+            self.fragment_broadcast(
+                round_number + 1, Message(MessageType.MOE, self.upcast_value)
+            )
             self.logger.info(
-                f"is root and will broadcast the MOE value which is {self.upcast_value}"
+                "is root and will broadcast the MOE value which is %s",
+                self.upcast_value,
             )
     else:
         self.fragment_broadcast(round_number + 1)
 
 
 def broadcast_moe_exit(self):
-    if self.broadcast_message == "TERMINATE":
+    if self.broadcast_message == TERMINATE_MESSAGE:
         self.stage = Stage.TERMINATED
         self.terminated = True
         return
 
     if self.local_moe_port is not None:
-        if float(self.broadcast_message) == float(
-            self.ports[self.local_moe_port]["weight"]
-        ):
+        if self.broadcast_message.value == self.ports[self.local_moe_port]["weight"]:
             self.logger.info(
-                f"has a MOE of weight {self.ports[self.local_moe_port]['weight']} which is equal to the weight of the fragment MOE which is {self.broadcast_message} "
+                "has a MOE of weight %s which is equal to the weight of the fragment MOE which is %s ",
+                self.ports[self.local_moe_port]["weight"],
+                self.broadcast_message.value,
             )
 
             self.is_fragment_moe = True
@@ -36,5 +39,6 @@ def broadcast_moe_exit(self):
         self.is_fragment_moe = False
 
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
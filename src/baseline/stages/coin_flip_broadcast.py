@@ -1,14 +1,27 @@
-import random
-from baseline.shared import Flip
+from baseline.shared import FLIP_MESSAGES, Flip, coin_flip
+
+
+def flip_coin(self) -> Flip:
+    """
+    Flip this node's next coin.
+
+    Each flip is a hash of the network seed, the node ID and the phase, so
+    the outcome does not depend on the order in which nodes are computed.
+    """
+    flip = coin_flip(self.network.seed, self.node_id, self.phase)
+    self.coin_flips += 1
+
+    return flip
 
 
 def coin_flip_broadcast_entry(self, round_number):
     if self.root:
-        coin_flip = random.choice([Flip.HEAD, Flip.TAIL])
+        coin_flip = flip_coin(self)
 
-        self.fragment_broadcast(round_number + 1, coin_flip)
+        self.fragment_broadcast(round_number + 1, FLIP_MESSAGES[coin_flip])
         self.logger.info(
-            f"is root and will broadcast the coin flip result which is {coin_flip}"
+            "is root and will broadcast the coin flip result which is %s",
+            coin_flip,
         )
     else:
         self.fragment_broadcast(round_number + 1)
@@ -16,11 +29,14 @@ def coin_flip_broadcast_entry(self, round_number):
 
 def coin_flip_broadcast_exit(self):
     self.logger.info(
-        f"Node {self.node_id}, the fragment is a {self.broadcast_message} fragment"
+        "Node %s, the fragment is a %s fragment",
+        self.node_id,
+        self.broadcast_message.value,
     )
 
-    self.fragment_flip = self.broadcast_message
+    self.fragment_flip = self.broadcast_message.value
 
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
@@ -1,2 +1,5 @@
+from baseline.shared import FIND_MOE_MESSAGE
+
+
 def find_moe_entry(self, round_number):
-    self.fragment_broadcast(round_number + 1, "FIND_MOE")
+    self.fragment_broadcast(round_number + 1, FIND_MOE_MESSAGE)
@@ -4,9 +4,12 @@ def merge_initial_entry(self, round_number):
 
 def merge_initial_exit(self):
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
 
     self.logger.info(
-        f'have "new_fragment_id": {self.new_fragment_id}, "new_level_number": {self.new_level_num}\''
+        'have "new_fragment_id": %s, "new_level_number": %s\'',
+        self.new_fragment_id,
+        self.new_level_num,
     )
@@ -3,10 +3,6 @@ def transmit_adjacent_moe_entry(self, round_number):
 
 
 def transmit_adjacent_moe_exit(self):
-    self.adjacent_moe.clear()
-
-    if self.inbox:
-        for port, message in self.inbox:
-            self.adjacent_moe[port] = message
+    self.adjacent_moe = {port: message.value for port, message in self.inbox}
 
     self.inbox.clear()
@@ -1,20 +1,23 @@
-from baseline.shared import EdgeState, Flip
+from baseline.shared import EdgeState, Flip, FragmentStateMessage, MessageType
 
 
 def transmit_adjacent_state_entry(self, round_number):
     self.transmit_adjacent(
         round_number + 1,
-        {"fragment_id": self.fragment_id, "level_number": self.i},
+        FragmentStateMessage(MessageType.FRAGMENT_STATE, self.fragment_id, self.i),
     )
 
     self.logger.info(
-        f'will transmit their state which is "fragment_id": {self.fragment_id}, "level_number": {self.i}'
+        "will transmit their state which is \"fragment_id\": %s, \"level_number\": %s",
+        self.fragment_id,
+        self.i,
     )
 
 
 def transmit_adjacent_state_exit(self):
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
 
     self.new_fragment_id = None
@@ -28,11 +31,13 @@ def transmit_adjacent_state_exit(self):
                 # set this valid MOE as a BRANCH edge
                 self.ports[self.local_moe_port]["state"] = EdgeState.BRANCH
 
-                self.new_fragment_id = message["fragment_id"]
-                self.new_level_num = message["level_number"] + 1
+                self.new_fragment_id = message.fragment_id
+                self.new_level_num = message.level_num + 1
 
                 self.logger.info(
-                    f'have "new_fragment_id": {self.new_fragment_id}, "new_level_number": {self.new_level_num}\''
+                    'have "new_fragment_id": %s, "new_level_number": %s\'',
+                    self.new_fragment_id,
+                    self.new_level_num,
                 )
 
                 self.new_parent_port = self.local_moe_port
@@ -58,7 +63,7 @@ def transmit_adjacent_state_exit(self):
 
     # identify fragment internal edges
     for port, message in self.inbox:
-        if message["fragment_id"] == self.fragment_id:
+        if message.fragment_id == self.fragment_id:
             # internal edge
             self.ports[port]["state"] = EdgeState.REJECTED
 
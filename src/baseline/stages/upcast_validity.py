@@ -5,11 +5,14 @@ def upcast_validity_entry(self, round_number):
 def upcast_validity_exit(self):
     if self.root:
         self.logger.info(
-            f"Node {self.node_id}, the fragment MOE is {'invalid' if int(self.upcast_value) else 'valid'}"
+            "Node %s, the fragment MOE is %s",
+            self.node_id,
+            'invalid' if int(self.upcast_value) else 'valid',
         )
 
         self.valid_moe = True if not int(self.upcast_value) else False
 
     self.logger.info(
-        f"has finished {self.stage}. It must now handle any logic and change stage."
+        "has finished %s. It must now handle any logic and change stage.",
+        self.stage,
     )
@@ -0,0 +1,616 @@
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy
+
+from baseline.main import MSTNetwork as BaselineMSTNetwork
+from optimized.main import MSTNetwork as OptimizedMSTNetwork
+from optimized.shared import DepthUpdate, Pipeline
+from optimized.vectorized import BatchedMST, VectorizedMST
+from simulator import PortBackend, Scheduler, export_chrome_trace, read_trace
+
+NETWORKS = {
+    "baseline": BaselineMSTNetwork,
+    "optimized": OptimizedMSTNetwork,
+}
+
+
+def generate_sparse_edges(n, extra_edges, seed):
+    """Random recursive tree on n nodes plus `extra_edges` random chords, with distinct weights."""
+    rng = numpy.random.default_rng(seed)
+
+    dst = numpy.arange(1, n)
+    src = (rng.random(n - 1) * dst).astype(numpy.int64)
+
+    chords_src = rng.integers(0, n, extra_edges)
+    chords_dst = rng.integers(0, n, extra_edges)
+    keep = chords_src != chords_dst
+    src = numpy.concatenate([src, chords_src[keep]])
+    dst = numpy.concatenate([dst, chords_dst[keep]])
+
+    # Drop duplicate edges, keeping the first occurrence
+    low = numpy.minimum(src, dst)
+    high = numpy.maximum(src, dst)
+    _, first = numpy.unique(low * n + high, return_index=True)
+    first.sort()
+    src, dst = src[first], dst[first]
+
+    weight = rng.permutation(len(src)) + 1
+    return src, dst, weight
+
+
+def generate_diameter_3_edges(n, hubs, extra_edges, seed):
+    """
+    Hubs form a clique and every other node hangs off a random hub, so any two
+    nodes are at most 3 hops apart. Random chords are added between non-hub nodes.
+    """
+    rng = numpy.random.default_rng(seed)
+
+    hub_src, hub_dst = numpy.triu_indices(hubs, k=1)
+    leaves = numpy.arange(hubs, n)
+    chords_src = rng.integers(hubs, n, extra_edges)
+    chords_dst = rng.integers(hubs, n, extra_edges)
+    keep = chords_src != chords_dst
+
+    src = numpy.concatenate([hub_src, leaves, chords_src[keep]])
+    dst = numpy.concatenate([hub_dst, rng.integers(0, hubs, len(leaves)), chords_dst[keep]])
+
+    low = numpy.minimum(src, dst)
+    high = numpy.maximum(src, dst)
+    _, first = numpy.unique(low * n + high, return_index=True)
+    first.sort()
+    src, dst = src[first], dst[first]
+
+    weight = rng.permutation(len(src)) + 1
+    return src, dst, weight
+
+
+def measure_memory(network_class, src, dst, weight, n, port_backend):
+    """Return the bytes allocated by loading the graph, in total and per node."""
+    gc.collect()
+    tracemalloc.start()
+
+    network = network_class.from_edge_arrays(
+        src, dst, weight, node_ids=range(n), port_backend=port_backend
+    )
+
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del network
+    return allocated, allocated / n
+
+
+def memory(args):
+    src, dst, weight = generate_sparse_edges(args.n, args.extra_edges, args.seed)
+
+    print(f"Memory per node for n = {args.n} and m = {len(src)}".center(60, "="))
+    for label, network_class in NETWORKS.items():
+        for port_backend in PortBackend:
+            allocated, per_node = measure_memory(
+                network_class, src, dst, weight, args.n, port_backend
+            )
+            print(
+                f"{label:>9} / {port_backend.value:<4}: {per_node:10.1f} bytes per node"
+                f" ({allocated / 2**20:.1f} MiB)"
+            )
+
+
+def schedulers(args):
+    src, dst, weight = generate_sparse_edges(args.n, args.extra_edges, args.seed)
+    network_class = NETWORKS[args.network]
+
+    print(f"{args.network} on n = {args.n} and m = {len(src)}".center(60, "="))
+    reference = None
+    for value in args.schedulers:
+        network = network_class.from_edge_arrays(
+            src,
+            dst,
+            weight,
+            node_ids=range(args.n),
+            seed=args.seed,
+            scheduler=Scheduler(value),
+            workers=args.workers,
+        )
+
+        start = time.perf_counter()
+        network.simulate_rounds()
+        elapsed = time.perf_counter() - start
+
+        result = (
+            network.get_mst()[0],
+            network.get_max_rounds(),
+            network.get_max_awake_rounds(),
+        )
+        if reference is None:
+            reference = result
+        matches = "matches" if result == reference else "DIFFERS"
+
+        print(f"{value:>13}: {elapsed:8.2f} s ({matches})")
+
+
+def profile(args):
+    src, dst, weight = generate_diameter_3_edges(args.n, args.hubs, args.extra_edges, args.seed)
+    network_class = NETWORKS[args.network]
+
+    print(f"{args.network} on n = {args.n} and m = {len(src)}".center(60, "="))
+    elapsed = {}
+    for enabled in (False, True):
+        network = network_class.from_edge_arrays(
+            src,
+            dst,
+            weight,
+            node_ids=range(args.n),
+            seed=args.seed,
+            scheduler=Scheduler(args.scheduler),
+            profile=enabled,
+        )
+
+        start = time.perf_counter()
+        network.simulate_rounds()
+        elapsed[enabled] = time.perf_counter() - start
+
+    print(
+        f"Unprofiled {elapsed[False]:.2f} s, profiled {elapsed[True]:.2f} s"
+        f" ({elapsed[True] / elapsed[False] - 1:+.0%})"
+    )
+    print(network.profiler.format_table())
+
+
+def messages(args):
+    src, dst, weight = generate_diameter_3_edges(args.n, args.hubs, args.extra_edges, args.seed)
+    network_class = NETWORKS[args.network]
+
+    print(f"{args.network} on n = {args.n} and m = {len(src)}".center(60, "="))
+    elapsed = {}
+    for enabled in (False, True):
+        network = network_class.from_edge_arrays(
+            src,
+            dst,
+            weight,
+            node_ids=range(args.n),
+            seed=args.seed,
+            scheduler=Scheduler(args.scheduler),
+            count_messages=enabled,
+        )
+
+        start = time.perf_counter()
+        network.simulate_rounds()
+        elapsed[enabled] = time.perf_counter() - start
+
+    print(
+        f"Uncounted {elapsed[False]:.2f} s, counted {elapsed[True]:.2f} s"
+        f" ({elapsed[True] / elapsed[False] - 1:+.0%})"
+    )
+    print(
+        f"{network.get_total_messages()} messages, {network.get_total_message_bits()} bits,"
+        f" at most {network.get_max_edge_round_bits()} bits per edge per round"
+    )
+
+
+def trace(args):
+    src, dst, weight = generate_diameter_3_edges(args.n, args.hubs, args.extra_edges, args.seed)
+    network_class = NETWORKS[args.network]
+
+    print(f"{args.network} on n = {args.n} and m = {len(src)}".center(60, "="))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.bin")
+
+        elapsed = {}
+        for enabled in (False, True):
+            network = network_class.from_edge_arrays(
+                src,
+                dst,
+                weight,
+                node_ids=range(args.n),
+                seed=args.seed,
+                scheduler=Scheduler(args.scheduler),
+                trace=path if enabled else None,
+            )
+
+            start = time.perf_counter()
+            network.simulate_rounds()
+            elapsed[enabled] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        records, labels = read_trace(path)
+        loaded = time.perf_counter() - start
+
+        print(
+            f"Untraced {elapsed[False]:.2f} s, traced {elapsed[True]:.2f} s"
+            f" ({elapsed[True] / elapsed[False] - 1:+.0%})"
+        )
+        print(
+            f"{len(records)} records, {os.path.getsize(path) / 2**20:.1f} MiB,"
+            f" loaded in {loaded * 1e3:.1f} ms"
+        )
+
+        # Awake node-rounds per stage
+        stages = numpy.bincount(records["stage"], minlength=len(labels["stage"]))
+        for code, count in enumerate(stages):
+            if count:
+                print(f"{labels['stage'][code] or '-':>26}: {count:>10}")
+
+        if args.chrome:
+            start = time.perf_counter()
+            export_chrome_trace(path, args.chrome)
+            print(
+                f"Chrome trace of {os.path.getsize(args.chrome) / 2**20:.1f} MiB"
+                f" written to {args.chrome} in {time.perf_counter() - start:.2f} s"
+            )
+
+
+def attribution(args):
+    src, dst, weight = generate_diameter_3_edges(args.n, args.hubs, args.extra_edges, args.seed)
+
+    for name in args.networks:
+        network = NETWORKS[name].from_edge_arrays(
+            src,
+            dst,
+            weight,
+            node_ids=range(args.n),
+            seed=args.seed,
+            scheduler=Scheduler.FAST_FORWARD,
+            attribute=True,
+        )
+        network.simulate_rounds()
+
+        print(f"{name} on n = {args.n} and m = {len(src)}".center(60, "="))
+        print(network.get_awake_report())
+
+
+def reset(args):
+    src, dst, weight = generate_diameter_3_edges(args.n, args.hubs, args.extra_edges, args.seed)
+    G = nx.Graph()
+    G.add_nodes_from(range(args.n))
+    G.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()))
+    network_class = NETWORKS[args.network]
+
+    print(f"{args.network} on n = {args.n} and m = {len(src)}".center(60, "="))
+    for port_backend in PortBackend:
+        reused = network_class.from_networkx(
+            G, seed=args.seed, scheduler=Scheduler.FAST_FORWARD, port_backend=port_backend
+        )
+        reused.simulate_rounds()
+
+        rebuild_time = reset_time = 0.0
+        matches = True
+        for seed in range(args.seed + 1, args.seed + 1 + args.runs):
+            start = time.perf_counter()
+            rebuilt = network_class.from_networkx(
+                G, seed=seed, scheduler=Scheduler.FAST_FORWARD, port_backend=port_backend
+            )
+            rebuild_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            reused.reset(seed=seed)
+            reset_time += time.perf_counter() - start
+
+            rebuilt.simulate_rounds()
+            reused.simulate_rounds()
+            matches &= (
+                rebuilt.get_mst()[0] == reused.get_mst()[0]
+                and [node.awake_rounds for node in rebuilt.nodes]
+                == [node.awake_rounds for node in reused.nodes]
+            )
+
+        print(
+            f"{port_backend.value:>4}: rebuild {rebuild_time / args.runs * 1000:8.1f} ms,"
+            f" reset {reset_time / args.runs * 1000:8.1f} ms per run"
+            f" ({'matches' if matches else 'DIFFERS'}, {rebuild_time / reset_time:.1f}x faster)"
+        )
+
+
+def vectorized(args):
+    for n in args.n:
+        src, dst, weight = generate_diameter_3_edges(
+            n, args.hubs, args.extra_edges_per_node * n, args.seed
+        )
+        print(f"Optimized on n = {n} and m = {len(src)}".center(60, "="))
+
+        start = time.perf_counter()
+        engine = VectorizedMST(src, dst, weight, node_ids=range(n), seed=args.seed)
+        engine.simulate()
+        engine_time = time.perf_counter() - start
+        print(
+            f"   Vectorized: {engine_time:8.2f} s, max rounds {engine.get_max_rounds()},"
+            f" max awake rounds {engine.get_max_awake_rounds()}"
+        )
+
+        if n > args.object_limit:
+            continue
+
+        start = time.perf_counter()
+        network = OptimizedMSTNetwork.from_edge_arrays(
+            src,
+            dst,
+            weight,
+            node_ids=range(n),
+            seed=args.seed,
+            scheduler=Scheduler.FAST_FORWARD,
+        )
+        network.simulate_rounds()
+        object_time = time.perf_counter() - start
+
+        matches = (
+            network.get_mst()[0] == engine.get_mst()[0]
+            and [node.awake_rounds for node in network.nodes] == engine.awake_rounds.tolist()
+            and [node.rounds for node in network.nodes] == engine.rounds.tolist()
+        )
+        print(
+            f"Fast-Forward : {object_time:8.2f} s ({'matches' if matches else 'DIFFERS'},"
+            f" {object_time / engine_time:.0f}x slower)"
+        )
+
+
+def diameter(args):
+    for n in args.n:
+        src, dst, weight = generate_sparse_edges(n, int(args.extra_edges_per_node * n), args.seed)
+
+        results = {}
+        for name, network_class, kwargs in (
+            ("baseline", BaselineMSTNetwork, {}),
+            ("optimized", OptimizedMSTNetwork, {"diameter": None}),
+            (
+                "optimized, on growth",
+                OptimizedMSTNetwork,
+                {"diameter": None, "depth_update": DepthUpdate.ON_GROWTH},
+            ),
+        ):
+            network = network_class.from_edge_arrays(
+                src,
+                dst,
+                weight,
+                node_ids=range(n),
+                seed=args.seed,
+                scheduler=Scheduler.FAST_FORWARD,
+                **kwargs,
+            )
+            network.simulate_rounds()
+            results[name] = network
+
+        bound = results["optimized"].nodes[0].diameter
+        print(f"n = {n}, m = {len(src)}, diameter bound {bound}".center(60, "="))
+        for name, network in results.items():
+            print(
+                f"{name:>21}: max rounds {network.get_max_rounds():>8},"
+                f" max awake rounds {network.get_max_awake_rounds():>6},"
+                f" messages {network.get_total_messages():>9}"
+            )
+
+
+def pipeline(args):
+    for n in args.n:
+        src, dst, weight = generate_diameter_3_edges(
+            n, args.hubs, args.extra_edges_per_node * n, args.seed
+        )
+        print(f"Optimized on n = {n}, m = {len(src)}".center(60, "="))
+
+        for stages in Pipeline:
+            network = OptimizedMSTNetwork.from_edge_arrays(
+                src,
+                dst,
+                weight,
+                node_ids=range(n),
+                seed=args.seed,
+                scheduler=Scheduler.FAST_FORWARD,
+                pipeline=stages,
+            )
+            network.simulate_rounds()
+            mst, ground_truth = network.get_mst()
+
+            print(
+                f"{stages.value:>16}: max rounds {network.get_max_rounds():>6},"
+                f" max awake rounds {network.get_max_awake_rounds():>5},"
+                f" messages {network.get_total_messages():>8}"
+                f"{'' if mst == ground_truth else ', WRONG MST'}"
+            )
+
+
+def batched(args):
+    rng = numpy.random.default_rng(args.seed)
+    sizes = rng.integers(args.min_n, args.max_n + 1, args.graphs).tolist()
+    graphs = [
+        generate_diameter_3_edges(n, args.hubs, args.extra_edges_per_node * n, args.seed + index)
+        for index, n in enumerate(sizes)
+    ]
+    print(f"Optimized on {args.graphs} graphs with n = {args.min_n}..{args.max_n}".center(60, "="))
+
+    start = time.perf_counter()
+    batch = BatchedMST(
+        ((src, dst, weight, range(n)) for n, (src, dst, weight) in zip(sizes, graphs)),
+        seed=args.seed,
+    )
+    batch.simulate()
+    batch_time = time.perf_counter() - start
+    print(f"      Batched: {batch_time:8.2f} s for {args.graphs} graphs")
+
+    msts = batch.get_mst()
+    max_rounds = batch.get_max_rounds()
+    max_awake_rounds = batch.get_max_awake_rounds()
+
+    # One by one, as `run_simulation` does
+    count = min(args.object_graphs, args.graphs)
+    start = time.perf_counter()
+    matches = True
+    for index in range(count):
+        src, dst, weight = graphs[index]
+        network = OptimizedMSTNetwork.from_edge_arrays(
+            src, dst, weight, node_ids=range(sizes[index]), seed=args.seed
+        )
+        network.simulate_rounds()
+        matches &= (
+            network.get_mst()[0] == msts[index][0]
+            and network.get_max_rounds() == max_rounds[index]
+            and network.get_max_awake_rounds() == max_awake_rounds[index]
+        )
+    object_time = (time.perf_counter() - start) / count * args.graphs
+    print(
+        f"   One by one: {object_time:8.2f} s estimated from {count} graphs"
+        f" ({'matches' if matches else 'DIFFERS'}, {object_time / batch_time:.0f}x slower)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the MST simulator.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    parser_memory = subparsers.add_parser(
+        "memory", help="Bytes per node of a loaded network on a sparse graph."
+    )
+    parser_memory.add_argument("--n", type=int, default=100_000)
+    parser_memory.add_argument("--extra-edges", type=int, default=100_000)
+    parser_memory.add_argument("--seed", type=int, default=42)
+    parser_memory.set_defaults(run=memory)
+
+    parser_schedulers = subparsers.add_parser(
+        "schedulers", help="Wall time of a full run under each scheduler."
+    )
+    parser_schedulers.add_argument("--network", choices=NETWORKS, default="baseline")
+    parser_schedulers.add_argument(
+        "--schedulers",
+        nargs="+",
+        choices=[scheduler.value for scheduler in Scheduler],
+        default=[Scheduler.EVENT_DRIVEN.value, Scheduler.MULTIPROCESS.value],
+    )
+    parser_schedulers.add_argument("--workers", type=int, default=None)
+    parser_schedulers.add_argument("--n", type=int, default=2_000)
+    parser_schedulers.add_argument("--extra-edges", type=int, default=2_000)
+    parser_schedulers.add_argument("--seed", type=int, default=42)
+    parser_schedulers.set_defaults(run=schedulers)
+
+    parser_profile = subparsers.add_parser(
+        "profile", help="Where the time of a run goes, per round, stage and procedure."
+    )
+    parser_profile.add_argument("--network", choices=NETWORKS, default="optimized")
+    parser_profile.add_argument(
+        "--scheduler",
+        choices=[scheduler.value for scheduler in Scheduler],
+        default=Scheduler.FAST_FORWARD.value,
+    )
+    parser_profile.add_argument("--n", type=int, default=1_000)
+    parser_profile.add_argument("--hubs", type=int, default=30)
+    parser_profile.add_argument("--extra-edges", type=int, default=4_000)
+    parser_profile.add_argument("--seed", type=int, default=42)
+    parser_profile.set_defaults(run=profile)
+
+    parser_messages = subparsers.add_parser(
+        "messages", help="Overhead of counting messages and bits, and the counts of a run."
+    )
+    parser_messages.add_argument("--network", choices=NETWORKS, default="optimized")
+    parser_messages.add_argument(
+        "--scheduler",
+        choices=[scheduler.value for scheduler in Scheduler],
+        default=Scheduler.FAST_FORWARD.value,
+    )
+    parser_messages.add_argument("--n", type=int, default=1_000)
+    parser_messages.add_argument("--hubs", type=int, default=30)
+    parser_messages.add_argument("--extra-edges", type=int, default=4_000)
+    parser_messages.add_argument("--seed", type=int, default=42)
+    parser_messages.set_defaults(run=messages)
+
+    parser_trace = subparsers.add_parser(
+        "trace", help="Overhead of recording the awake timeline, and its size."
+    )
+    parser_trace.add_argument("--network", choices=NETWORKS, default="optimized")
+    parser_trace.add_argument(
+        "--scheduler",
+        choices=[scheduler.value for scheduler in Scheduler],
+        default=Scheduler.FAST_FORWARD.value,
+    )
+    parser_trace.add_argument("--n", type=int, default=1_000)
+    parser_trace.add_argument("--hubs", type=int, default=30)
+    parser_trace.add_argument("--extra-edges", type=int, default=4_000)
+    parser_trace.add_argument("--seed", type=int, default=42)
+    parser_trace.add_argument(
+        "--chrome", default=None, help="Also export the trace as Chrome trace-event JSON to this path."
+    )
+    parser_trace.set_defaults(run=trace)
+
+    parser_attribution = subparsers.add_parser(
+        "attribution", help="Awake rounds per stage, procedure and transmission round."
+    )
+    parser_attribution.add_argument(
+        "--networks", nargs="+", choices=NETWORKS, default=list(NETWORKS)
+    )
+    parser_attribution.add_argument("--n", type=int, default=1_000)
+    parser_attribution.add_argument("--hubs", type=int, default=30)
+    parser_attribution.add_argument("--extra-edges", type=int, default=4_000)
+    parser_attribution.add_argument("--seed", type=int, default=42)
+    parser_attribution.set_defaults(run=attribution)
+
+    parser_reset = subparsers.add_parser(
+        "reset", help="Time to prepare a rerun by resetting the network or rebuilding it."
+    )
+    parser_reset.add_argument("--network", choices=NETWORKS, default="optimized")
+    parser_reset.add_argument("--n", type=int, default=1_000)
+    parser_reset.add_argument("--hubs", type=int, default=30)
+    parser_reset.add_argument("--extra-edges", type=int, default=4_000)
+    parser_reset.add_argument("--runs", type=int, default=3)
+    parser_reset.add_argument("--seed", type=int, default=42)
+    parser_reset.set_defaults(run=reset)
+
+    parser_vectorized = subparsers.add_parser(
+        "vectorized",
+        help="Wall time of the vectorized optimized engine on diameter-3 graphs.",
+    )
+    parser_vectorized.add_argument("--n", type=int, nargs="+", default=[2_000, 100_000])
+    parser_vectorized.add_argument("--hubs", type=int, default=30)
+    parser_vectorized.add_argument("--extra-edges-per-node", type=int, default=2)
+    parser_vectorized.add_argument(
+        "--object-limit",
+        type=int,
+        default=20_000,
+        help="Largest n also run, and compared, on the object simulator.",
+    )
+    parser_vectorized.add_argument("--seed", type=int, default=42)
+    parser_vectorized.set_defaults(run=vectorized)
+
+    parser_diameter = subparsers.add_parser(
+        "diameter",
+        help="Rounds and messages of both networks on sparse graphs, with a derived diameter bound.",
+    )
+    parser_diameter.add_argument("--n", type=int, nargs="+", default=[200, 1_000])
+    parser_diameter.add_argument("--extra-edges-per-node", type=float, default=0.5)
+    parser_diameter.add_argument("--seed", type=int, default=42)
+    parser_diameter.set_defaults(run=diameter)
+
+    parser_pipeline = subparsers.add_parser(
+        "pipeline",
+        help="Rounds and messages of the optimized network with each set of stages.",
+    )
+    parser_pipeline.add_argument("--n", type=int, nargs="+", default=[200, 1_000])
+    parser_pipeline.add_argument("--hubs", type=int, default=30)
+    parser_pipeline.add_argument("--extra-edges-per-node", type=int, default=2)
+    parser_pipeline.add_argument("--seed", type=int, default=42)
+    parser_pipeline.set_defaults(run=pipeline)
+
+    parser_batched = subparsers.add_parser(
+        "batched",
+        help="Wall time of a batch of small diameter-3 graphs, together and one by one.",
+    )
+    parser_batched.add_argument("--graphs", type=int, default=1_000)
+    parser_batched.add_argument("--min-n", type=int, default=50)
+    parser_batched.add_argument("--max-n", type=int, default=500)
+    parser_batched.add_argument("--hubs", type=int, default=5)
+    parser_batched.add_argument("--extra-edges-per-node", type=int, default=2)
+    parser_batched.add_argument(
+        "--object-graphs",
+        type=int,
+        default=20,
+        help="Graphs also run one by one on the object simulator, to estimate its total time.",
+    )
+    parser_batched.add_argument("--seed", type=int, default=42)
+    parser_batched.set_defaults(run=batched)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
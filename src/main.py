@@ -1,3 +1,5 @@
+import argparse
+import itertools
 import os
 import random
 import networkx as nx
@@ -7,21 +9,46 @@ from baseline.main import MSTNetwork as BaselineMSTNetwork
 from optimized.main import MSTNetwork as OptimizedMSTNetwork
 
 
-def generate_graph(n):
-    while True:
+def generate_graph(n, diameter=3):
+    """
+    Generate a random connected graph of n nodes with the given diameter and distinct weights.
+
+    Nodes are placed on layers 0 to `diameter`, with a path through one node
+    of each layer. Every other node joins the path node of a middle layer,
+    and random edges are added between nodes of the same or adjacent layers.
+    No edge skips a layer, so the ends of the path stay `diameter` hops apart,
+    while any two nodes are joined through the path in at most `diameter` hops.
+    """
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+
+    if diameter == 1:
+        G.add_edges_from(itertools.combinations(range(n), 2))
+    else:
+        nodes = random.sample(range(n), n)
+        path = nodes[: diameter + 1]
+        nx.add_path(G, path)
+
+        layers = {node: layer for layer, node in enumerate(path)}
+        for node in nodes[diameter + 1 :]:
+            layers[node] = random.randint(1, diameter - 1)
+            G.add_edge(node, path[layers[node]])
+
         p = random.uniform(0, 1)
-        G = nx.fast_gnp_random_graph(n, p)
-        if not nx.is_connected(G):
-            continue
-        if nx.diameter(G) == 3:
-            edges = list(G.edges())
-            random_weights = random.sample(range(1, len(edges) + 100), len(edges))
-            weighted_edges = [
-                (u, v, {"weight": w}) for (u, v), w in zip(edges, random_weights)
-            ]
-            G.add_edges_from(weighted_edges)
-            return G
-        
+        for u, v in itertools.combinations(range(n), 2):
+            if abs(layers[u] - layers[v]) <= 1 and random.random() < p:
+                G.add_edge(u, v)
+
+    assert nx.diameter(G) == diameter
+
+    edges = list(G.edges())
+    random_weights = random.sample(range(1, len(edges) + 100), len(edges))
+    weighted_edges = [
+        (u, v, {"weight": w}) for (u, v), w in zip(edges, random_weights)
+    ]
+    G.add_edges_from(weighted_edges)
+    return G
+
 
 def save_graph(G, title="Graph", filename="graph.png", mst_edges=None):
     num_nodes = G.number_of_nodes()
@@ -77,8 +104,8 @@ def save_graph(G, title="Graph", filename="graph.png", mst_edges=None):
 
 
 
-def run_simulation(network_class, graph, label):
-    network = network_class(seed=42)
+def run_simulation(network_class, graph, label, **kwargs):
+    network = network_class(seed=42, **kwargs)
     network.load_networkx_graph(graph)
     network.simulate_rounds()
 
@@ -93,11 +120,24 @@ def run_simulation(network_class, graph, label):
     print(f"✅ {label}: Distributed MST matches the ground truth MST.")
     print(f"Max awake rounds : {max_awake_rounds}")
     print(f"Max total rounds : {max_rounds}")
+    print(f"Messages sent    : {network.get_total_messages()} ({network.get_total_message_bits()} bits)")
+    print(f"Max bits per edge per round : {network.get_max_edge_round_bits()}")
 
     return dist_mst, max_rounds, max_awake_rounds
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Compare both MST algorithms on random graphs.")
+    parser.add_argument(
+        "--diameter",
+        type=int,
+        default=3,
+        help="Diameter of the generated graphs, also the optimized network's diameter bound.",
+    )
+    args = parser.parse_args()
+    if args.diameter < 1:
+        parser.error("The diameter must be at least 1.")
+
     os.system("clear")
 
     while True:
@@ -109,14 +149,16 @@ def main():
             n = int(user_input)
             if n < 5:
                 raise ValueError("The number of nodes in the graph must be at least 5.")
-            
+            if args.diameter > n - 1:
+                raise ValueError(f"A graph of diameter {args.diameter} needs more than {n} nodes.")
+
             os.system("clear")
         except ValueError as e:
             print(f"Invalid input: {e}")
             continue
 
-        print(f"\nGenerating graph with diameter 3 and {n} nodes...")
-        graph = generate_graph(n)
+        print(f"\nGenerating graph with diameter {args.diameter} and {n} nodes...")
+        graph = generate_graph(n, args.diameter)
         print("Graph generated successfully!")
 
         # Compute MST from NetworkX for overlay
@@ -136,7 +178,7 @@ def main():
             BaselineMSTNetwork, graph, "Baseline"
         )
         optimized_mst, optimized_max_rounds, optimized_max_awake_rounds = run_simulation(
-            OptimizedMSTNetwork, graph, "Optimized"
+            OptimizedMSTNetwork, graph, "Optimized", diameter=args.diameter
         )
 
         # Differences
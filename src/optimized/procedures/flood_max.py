@@ -1,34 +1,50 @@
 from collections import deque
-from optimized.shared import Procedure, TransmissionRound
+from optimized.shared import DepthUpdate, Message, MessageType, Procedure, TransmissionRound
 
 
 def flood_max(self, start_round: int):
+    """
+    Initialize the Flood Maximum Depth procedure.
+
+    A value travels one hop per Side-Send-Receive round, so after as many
+    rounds as the diameter bound every node holds the maximum over the graph.
+
+    With `DepthUpdate.ON_GROWTH`, the round the procedure is initialized in,
+    the one before `start_round`, is its first round. Every node starts from
+    its own level, and only the leaves of the fragment trees send it, as a
+    node with a child is never the deepest. After that, a node only sends
+    when the value it holds grew. The flood still covers every node for as
+    many rounds as the diameter bound, so the maximum depth can shrink.
+    :param start_round: The round to start the procedure.
+    """
     self.logger.info("Initializing Flood Maximum Depth start at round %s", start_round)
 
     base = start_round
+    rounds = self.diameter
+    if self.depth_update == DepthUpdate.ON_GROWTH:
+        self.maximum_depth = self.i
+        if not self.child_ports:
+            message = Message(MessageType.DEPTH, self.i)
+            for port in self.ports:
+                self.send_message(port, message)
+                self.logger.info("Sent maximum depth %s to port %s", self.i, port)
+        rounds -= 1
 
     schedule_items = [
         (
-            base,
-            Procedure.FLOOD_MAXIMUM_DEPTH,
-            TransmissionRound.SIDE_SEND_RECEIVE,
-        ),
-        (
-            base + 1,
-            Procedure.FLOOD_MAXIMUM_DEPTH,
-            TransmissionRound.SIDE_SEND_RECEIVE,
-        ),
-        (
-            base + 2,
+            base + offset,
             Procedure.FLOOD_MAXIMUM_DEPTH,
             TransmissionRound.SIDE_SEND_RECEIVE,
-        ),
+        )
+        for offset in range(rounds)
+    ]
+    schedule_items.append(
         (
-            base + 3,
+            base + rounds,
             Procedure.FLOOD_MAXIMUM_DEPTH,
             TransmissionRound.END,
-        ),
-    ]
+        )
+    )
 
     # Populate the schedule queue
     self.schedule = deque(schedule_items)
@@ -39,14 +55,27 @@ def flood_max(self, start_round: int):
 
 
 def _flood_max_handler(self, phase: TransmissionRound):
-    if phase == TransmissionRound.SIDE_SEND_RECEIVE:
+    if phase == TransmissionRound.SIDE_SEND_RECEIVE and self.depth_update == DepthUpdate.ON_GROWTH:
+        result = max([message.value for _, message in self.inbox], default=0)
+
+        if result > self.maximum_depth:
+            message = Message(MessageType.DEPTH, result)
+            for port in self.ports:
+                self.send_message(port, message)
+                self.logger.info("Sent maximum depth %s to port %s", result, port)
+
+            self.maximum_depth = result
+        self.inbox.clear()
+
+    elif phase == TransmissionRound.SIDE_SEND_RECEIVE:
         if self.inbox:
-            result = result = max(*[message for _, message in self.inbox], self.i)
+            result = max(*[message.value for _, message in self.inbox], self.i)
         else:
             result = self.i
 
+        message = Message(MessageType.DEPTH, result)
         for port in self.ports:
-            self.send_message(port, result)
+            self.send_message(port, message)
             self.logger.info("Sent maximum depth %s to port %s", result, port)
 
         self.maximum_depth = result
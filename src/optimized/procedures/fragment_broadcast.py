@@ -1,15 +1,16 @@
 from collections import deque
-from optimized.shared import Procedure, TransmissionRound
+from optimized.shared import Message, Procedure, TransmissionRound
 
 
-def fragment_broadcast(self, start_round: int, message: str = None):
+def fragment_broadcast(self, start_round: int, message: Message = None):
     """
     Initialize the Fragment Broadcast procedure with a given message.
     :param start_round: The round to start the procedure.
     :param message: The initial message for the broadcast.
     """
     self.logger.info(
-        f"initializing Fragment Broadcast starting at round {start_round}."
+        "initializing Fragment Broadcast starting at round %s.",
+        start_round,
     )
 
     self.broadcast_message = (
@@ -71,7 +72,9 @@ def _fragment_broadcast_handler(self, phase: TransmissionRound):
         for port in self.child_ports:
             self.send_message(port, self.broadcast_message)
             self.logger.info(
-                f"sent value {self.broadcast_message} to child via port {port}."
+                "sent value %s to child via port %s.",
+                self.broadcast_message,
+                port,
             )
     elif phase == TransmissionRound.END:
         self.logger.info("is in END round.")
@@ -1,9 +1,9 @@
 from collections import deque
-from optimized.shared import Procedure, TransmissionRound
+from optimized.shared import MergeStateMessage, MessageType, Procedure, TransmissionRound
 
 
 def merge_down(self, start_round: int):
-    self.logger.info(f"initializing Merge Down starting at round {start_round}.")
+    self.logger.info("initializing Merge Down starting at round %s.", start_round)
 
     base = start_round - 1
 
@@ -63,20 +63,18 @@ def _merge_down_handler(self, phase: TransmissionRound):
 
         if self.inbox and self.new_level_num is None:
             port, message = self.inbox[0]
-            new_level_num, new_fragment_id = message.values()
-            self.new_level_num = new_level_num + 1
-            self.new_fragment_id = new_fragment_id
+            self.new_level_num = message.new_level_num + 1
+            self.new_fragment_id = message.new_fragment_id
             self.new_parent_port = port
             self.new_child_ports = self.child_ports[:]
 
             self.inbox.clear()
 
         # sends down the value of its NEW-LEVEL-NUM and also the value of its NEW-FRAGMENT-ID.
-        message = {
-            "new_level_num": self.new_level_num,
-            "new_fragment_id": self.new_fragment_id,
-        }
+        message = MergeStateMessage(
+            MessageType.MERGE_STATE, self.new_level_num, self.new_fragment_id
+        )
 
         for port in self.child_ports:
             self.send_message(port, message)
-            self.logger.info(f"sent: {message} to child via port {port}.")
+            self.logger.info("sent: %s to child via port %s.", message, port)
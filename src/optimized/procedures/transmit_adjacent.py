@@ -8,7 +8,10 @@ def transmit_adjacent(self, start_round: int, message):
     :param start_round: The round to start the procedure.
     :param message: The message to be transmitted to adjacent nodes.
     """
-    self.logger.info(f"initializing Transmit Adjacent starting at round {start_round}.")
+    self.logger.info(
+        "initializing Transmit Adjacent starting at round %s.",
+        start_round,
+    )
 
     self.adjacent_message = message  # Set the message to be transmitted
     base = start_round
@@ -46,4 +49,4 @@ def _transmit_adjacent_handler(self, phase: TransmissionRound):
 
         for port in ports:
             self.send_message(port, self.adjacent_message)
-            self.logger.info(f"sent value {self.adjacent_message} via port {port}.")
+            self.logger.info("sent value %s via port %s.", self.adjacent_message, port)
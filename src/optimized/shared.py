@@ -1,4 +1,6 @@
-from enum import Enum
+import hashlib
+from enum import Enum, IntEnum
+from typing import Any, NamedTuple, Optional
 
 
 class Procedure(Enum):
@@ -42,6 +44,165 @@ class Stage(Enum):
     UPDATE_SCHEDULE_DEPTH = "Update-Schedule-Depth"
 
 
+# Diameter bound of the graphs the optimized variant was designed for, see `flood_max`
+DEFAULT_DIAMETER = 3
+
+
+class DepthUpdate(Enum):
+    FLOOD = "Flood"  # Every node floods its level after every merge, and takes the maximum
+    ON_GROWTH = "On-Growth"  # Leaves send their level, then a node only sends when its value grew
+
+
+class Pipeline(Enum):
+    PAPER = "Paper"  # One value per broadcast, as in the paper
+    FUSED_BROADCAST = "Fused-Broadcast"  # The MOE weight and the coin flip share one broadcast
+    FUSED = "Fused"  # They also share one exchange with adjacent fragments
+
+
+# Stage entered after Transmit-Adjacent-MOE, which depends on the stages skipped
+AFTER_TRANSMIT_ADJACENT_MOE = {
+    Pipeline.PAPER: Stage.COIN_FLIP_BROADCAST,
+    Pipeline.FUSED_BROADCAST: Stage.TRANSMIT_ADJACENT_FLIP,
+    Pipeline.FUSED: Stage.UPCAST_VALIDITY,
+}
+
+
 class Flip(Enum):
     HEAD = "Head"
     TAIL = "Tail"
+
+
+# Constants of the splitmix64 generator, see `mix`
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MASK_64 = (1 << 64) - 1
+
+
+def mix(value: int) -> int:
+    """Advance a splitmix64 state and return its output, a well mixed 64-bit integer."""
+    z = (value + GOLDEN_GAMMA) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+def node_key(node_id) -> int:
+    """
+    Return a 64-bit integer that identifies a node in every process.
+    Integer IDs are used as they are, other IDs are hashed from their repr,
+    since the built-in `hash` of a string changes between interpreter runs.
+    :param node_id: The ID of the node.
+    """
+    if isinstance(node_id, int):
+        return node_id & MASK_64
+
+    digest = hashlib.blake2b(repr(node_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def coin_flip(seed: int, node_id, phase: int) -> Flip:
+    """
+    Return a node's coin flip, which only depends on the seed, the node ID and the phase.
+    The three are hashed with splitmix64, a counter-based generator, so there
+    is no generator state to share between nodes, processes or engines.
+    :param seed: The seed of the network.
+    :param node_id: The ID of the flipping node.
+    :param phase: The phase in which the node flips.
+    """
+    value = mix(mix(mix(seed & MASK_64) ^ node_key(node_id)) ^ (phase & MASK_64))
+    return Flip.HEAD if value >> 63 == 0 else Flip.TAIL
+
+
+class MessageType(IntEnum):
+    FIND_MOE = 0
+    TERMINATE = 1
+    VALUE = 2
+    MOE = 3
+    FLIP = 4
+    VALIDITY = 5
+    FRAGMENT_STATE = 6
+    MERGE_STATE = 7
+    DEPTH = 8
+    MOE_FLIP = 9
+
+
+# Bits needed to encode the message type tag
+TYPE_BITS = (len(MessageType) - 1).bit_length()
+
+# Bits assumed for a payload that is not an integer, e.g. a float weight
+FLOAT_BITS = 64
+
+INFINITY = float("inf")
+
+
+def value_bits(value: Any) -> int:
+    """
+    Estimate the number of bits needed to encode a single payload value.
+    :param value: The value to encode.
+    """
+    # Plain integers are by far the most common payload, so they are checked first
+    if type(value) is int:
+        return abs(value).bit_length() or 1
+    if value is None or isinstance(value, (bool, Flip)):
+        return 1
+    if value == INFINITY:
+        # No outgoing edge, encoded like an empty value
+        return 1
+    if isinstance(value, int):
+        return abs(value).bit_length() or 1
+    return FLOAT_BITS
+
+
+class Message(NamedTuple):
+    """A message carrying at most one value, tagged with its type."""
+
+    type: MessageType
+    value: Any = None
+
+    def bits(self) -> int:
+        if self.value is None:
+            return TYPE_BITS
+        return TYPE_BITS + value_bits(self.value)
+
+
+class MoeFlipMessage(NamedTuple):
+    """The fragment MOE weight and the coin flip of the root, broadcast together."""
+
+    type: MessageType
+    value: Any  # The MOE weight, where a `Message` of type MOE holds it
+    flip: Flip
+
+    def bits(self) -> int:
+        return TYPE_BITS + value_bits(self.value) + value_bits(self.flip)
+
+
+class FragmentStateMessage(NamedTuple):
+    """The fragment ID and level number of the sender, sent to adjacent nodes."""
+
+    type: MessageType
+    fragment_id: int
+    level_num: int
+
+    def bits(self) -> int:
+        return TYPE_BITS + value_bits(self.fragment_id) + value_bits(self.level_num)
+
+
+class MergeStateMessage(NamedTuple):
+    """The new level number and fragment ID, empty (None) when the sender has none."""
+
+    type: MessageType
+    new_level_num: Optional[int]
+    new_fragment_id: Optional[int]
+
+    def bits(self) -> int:
+        return (
+            TYPE_BITS + value_bits(self.new_level_num) + value_bits(self.new_fragment_id)
+        )
+
+
+# Messages with constant payloads are shared rather than allocated per send
+FIND_MOE_MESSAGE = Message(MessageType.FIND_MOE)
+TERMINATE_MESSAGE = Message(MessageType.TERMINATE)
+FLIP_MESSAGES = {flip: Message(MessageType.FLIP, flip) for flip in Flip}
+VALIDITY_MESSAGES = {
+    validity: Message(MessageType.VALIDITY, validity) for validity in (True, False)
+}
@@ -1,32 +1,60 @@
-from optimized.shared import Stage
+from optimized.shared import (
+    Message,
+    MessageType,
+    MoeFlipMessage,
+    Pipeline,
+    Stage,
+    TERMINATE_MESSAGE,
+)
+from optimized.stages.coin_flip_broadcast import flip_coin
 
 
 def broadcast_moe_entry(self, round_number):
     if self.root:
         if self.upcast_value == float("inf"):
-            self.fragment_broadcast(round_number + 1, "TERMINATE")
+            self.fragment_broadcast(round_number + 1, TERMINATE_MESSAGE)
+
+        elif self.pipeline != Pipeline.PAPER:
+            # The coin flip rides along, so Coin-Flip-Broadcast is skipped
+            coin_flip = flip_coin(self)
+            self.fragment_broadcast(
+                round_number + 1,
+                MoeFlipMessage(MessageType.MOE_FLIP, self.upcast_value, coin_flip),
+            )
+            self.logger.info(
+                "is root and will broadcast the MOE value which is %s"
+                " and the coin flip result which is %s",
+                self.upcast_value,
+                coin_flip,
+            )
 
         else:
-            self.fragment_broadcast(round_number + 1, self.upcast_value)
+            self.fragment_broadcast(
+                round_number + 1, Message(MessageType.MOE, self.upcast_value)
+            )
             self.logger.info(
-                f"is root and will broadcast the MOE value which is {self.upcast_value}"
+                "is root and will broadcast the MOE value which is %s",
+                self.upcast_value,
             )
     else:
         self.fragment_broadcast(round_number + 1)
 
 
 def broadcast_moe_exit(self):
-    if self.broadcast_message == "TERMINATE":
+    if self.broadcast_message == TERMINATE_MESSAGE:
         self.stage = Stage.TERMINATED
         self.terminated = True
         return
 
+    if self.broadcast_message.type == MessageType.MOE_FLIP:
+        self.fragment_flip = self.broadcast_message.flip
+
     if self.local_moe_port is not None:
-        if float(self.broadcast_message) == float(
-            self.ports[self.local_moe_port]["weight"]
-        ):
+        if self.broadcast_message.value == self.ports[self.local_moe_port]["weight"]:
             self.logger.info(
-                f"has a MOE of weight {self.ports[self.local_moe_port]['weight']} which is equal to the weight of the fragment MOE which is {self.broadcast_message} "
+                "has a MOE of weight %s which is equal to the weight of the fragment MOE which is %s ",
+                self.ports[self.local_moe_port]["weight"],
+                self.broadcast_message.value,
             )
 
             self.is_fragment_moe = True
@@ -36,5 +64,6 @@ def broadcast_moe_exit(self):
         self.is_fragment_moe = False
 
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
@@ -1,8 +1,14 @@
+from optimized.shared import VALIDITY_MESSAGES
+
+
 def broadcast_validity_entry(self, round_number):
     if self.root:
-        self.fragment_broadcast(round_number + 1, self.valid_moe)
+        self.fragment_broadcast(
+            round_number + 1, VALIDITY_MESSAGES[bool(self.valid_moe)]
+        )
         self.logger.info(
-            f"is root and will broadcast the validity of the MOE which is: {'valid' if self.valid_moe else 'invalid'}"
+            "is root and will broadcast the validity of the MOE which is: %s",
+            "valid" if self.valid_moe else "invalid",
         )
     else:
         self.fragment_broadcast(round_number + 1)
@@ -10,11 +16,13 @@ def broadcast_validity_entry(self, round_number):
 
 def broadcast_validity_exit(self):
     self.logger.info(
-        f"the fragment MOE is {'valid' if self.broadcast_message else 'invalid'}"
+        "the fragment MOE is %s",
+        "valid" if self.broadcast_message.value else "invalid",
     )
 
-    self.valid_moe = self.broadcast_message
+    self.valid_moe = self.broadcast_message.value
 
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
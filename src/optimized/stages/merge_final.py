@@ -4,11 +4,14 @@ def merge_final_entry(self, round_number):
 
 def merge_final_exit(self):
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
 
     self.logger.info(
-        f'have "new_fragment_id": {self.new_fragment_id}, "new_level_number": {self.new_level_num}\''
+        'have "new_fragment_id": %s, "new_level_number": %s\'',
+        self.new_fragment_id,
+        self.new_level_num,
     )
 
     # updates its fragment ID to NEW-FRAGMENT-ID and updates its level number to NEW-LEVEL-NUM assuming they're non-empty
@@ -27,8 +30,8 @@ def merge_final_exit(self):
 
         self.new_parent_port = None
 
-        self.child_ports = self.new_child_ports[:]  # create a shallow copy
-        self.new_child_ports.clear()
+        self.child_ports = self.new_child_ports
+        self.new_child_ports = None
 
     self.inbox.clear()
 
@@ -1,29 +1,28 @@
-from optimized.shared import Flip
+from optimized.shared import FLIP_MESSAGES, Flip
 
 
 def transmit_adjacent_flip_entry(self, round_number):
-    self.transmit_adjacent(round_number + 1, self.broadcast_message)
+    # The message broadcast in Coin-Flip-Broadcast, or the flip of a fused broadcast
+    self.transmit_adjacent(round_number + 1, FLIP_MESSAGES[self.fragment_flip])
 
-    self.logger.info(f"will transmit the FLIP value which is {self.broadcast_message}")
+    self.logger.info("will transmit the FLIP value which is %s", self.fragment_flip)
 
 
 def transmit_adjacent_flip_exit(self):
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
 
-    self.adjacent_flip.clear()
+    self.adjacent_flip = {port: message.value for port, message in self.inbox}
 
-    for port, message in self.inbox:
-        self.adjacent_flip[port] = message
-
-    self.logger.info(f"Node {self.node_id}: {self.adjacent_flip}")
+    self.logger.info("Node %s: %s", self.node_id, self.adjacent_flip)
 
     status = False
 
     # does this node have the MOE? If not ignore
     if self.is_fragment_moe:
-        self.logger.info(f"Node {self.node_id}: {self.fragment_flip}")
+        self.logger.info("Node %s: %s", self.node_id, self.fragment_flip)
 
         if self.fragment_flip == Flip.TAIL:
             # iterate through the messages received from adjacent nodes not in the fragment
@@ -32,7 +31,7 @@ def transmit_adjacent_flip_exit(self):
                 message,
             ) in self.inbox:
                 # find the flip of the fragment which contains the node that is the destination of the MOE
-                if port == self.local_moe_port and message == Flip.HEAD:
+                if port == self.local_moe_port and message.value == Flip.HEAD:
                     status = True
 
                     break
@@ -1,12 +1,26 @@
+from optimized.shared import Flip, Message, MessageType, Pipeline
+
+
 def transmit_adjacent_moe_entry(self, round_number):
-    self.transmit_adjacent(round_number + 1, self.broadcast_message)
+    message = self.broadcast_message
+    if message.type == MessageType.MOE_FLIP and self.pipeline != Pipeline.FUSED:
+        # Adjacent fragments learn the coin flip in Transmit-Adjacent-Flip
+        message = Message(MessageType.MOE, message.value)
+
+    self.transmit_adjacent(round_number + 1, message)
 
 
 def transmit_adjacent_moe_exit(self):
-    self.adjacent_moe.clear()
+    self.adjacent_moe = {port: message.value for port, message in self.inbox}
 
-    if self.inbox:
-        for port, message in self.inbox:
-            self.adjacent_moe[port] = message
+    if self.pipeline == Pipeline.FUSED:
+        # The coin flips came along, so the MOE is validated as in Transmit-Adjacent-Flip
+        self.adjacent_flip = {port: message.flip for port, message in self.inbox}
+        self.valid_moe = (
+            self.is_fragment_moe
+            and self.fragment_flip == Flip.TAIL
+            and self.adjacent_flip.get(self.local_moe_port) == Flip.HEAD
+        )
+        self.logger.info("Valid" if self.valid_moe else "Invalid")
 
     self.inbox.clear()
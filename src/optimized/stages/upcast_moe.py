@@ -15,15 +15,16 @@ def upcast_moe_entry(self, round_number):
     )
 
     self.local_moe_port = moe[0]
-    self.logger.info(f"local MOE on port {self.local_moe_port}")
+    self.logger.info("local MOE on port %s", self.local_moe_port)
 
     self.upcast_min(round_number + 1, moe[1])
 
 
 def upcast_moe_exit(self):
     if self.root:
-        self.logger.info(f"ROOT: upcast min value is {self.upcast_value}")
+        self.logger.info("ROOT: upcast min value is %s", self.upcast_value)
 
     self.logger.info(
-        f"has finished stage {self.stage}. It must now handle any logic and change stage."
+        "has finished stage %s. It must now handle any logic and change stage.",
+        self.stage,
     )
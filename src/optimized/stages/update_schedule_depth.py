@@ -1,3 +1,6 @@
+from optimized.shared import DepthUpdate
+
+
 def update_schedule_depth_entry(self, round_number):
     self.logger.info("Update Schedule Depth Entry Method")
 
@@ -8,7 +11,9 @@ def update_schedule_depth_exit(self):
     result = None
 
     if self.inbox:
-        result = result = max(*[message for _, message in self.inbox], self.i)
+        # Flooding on growth holds the largest level received so far in the maximum depth
+        floor = self.maximum_depth if self.depth_update == DepthUpdate.ON_GROWTH else self.i
+        result = max(*[message.value for _, message in self.inbox], floor)
         self.maximum_depth = result
 
     self.phase += 1
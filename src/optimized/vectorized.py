@@ -0,0 +1,712 @@
+import random
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy
+
+from simulator import Scheduler
+from optimized.shared import (
+    DEFAULT_DIAMETER,
+    GOLDEN_GAMMA,
+    MASK_64,
+    DepthUpdate,
+    Pipeline,
+    mix,
+    node_key,
+)
+
+# Edge states, as stored in `VectorizedMST.state`
+BASIC, BRANCH, REJECTED = 0, 1, 2
+
+
+def mix_array(values):
+    """Apply `shared.mix` to every element of an unsigned 64-bit array, which wraps like the masked integers."""
+    z = values + numpy.uint64(GOLDEN_GAMMA)
+    z = (z ^ (z >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+    return z ^ (z >> numpy.uint64(31))
+
+
+def edge_positions(src, dst, weight, node_ids=None):
+    """
+    Number the nodes of a graph given as parallel edge arrays.
+    :param src: The ID of the first endpoint of each edge.
+    :param dst: The ID of the second endpoint of each edge.
+    :param weight: The weight of each edge.
+    :param node_ids: All node IDs in order, defaults to the endpoints in order of first appearance.
+    :return: The node IDs in position order, and the endpoint positions and weight of each edge.
+    """
+    src, dst, weight = (
+        array.tolist() if hasattr(array, "tolist") else list(array)
+        for array in (src, dst, weight)
+    )
+
+    if not len(src) == len(dst) == len(weight):
+        raise ValueError("The edge arrays must all have the same length.")
+
+    if node_ids is None:
+        node_ids = dict.fromkeys(node_id for pair in zip(src, dst) for node_id in pair)
+    elif hasattr(node_ids, "tolist"):
+        node_ids = node_ids.tolist()
+    node_ids = list(node_ids)
+
+    positions = {node_id: position for position, node_id in enumerate(node_ids)}
+    u = numpy.array([positions[node_id] for node_id in src], dtype=numpy.int64)
+    v = numpy.array([positions[node_id] for node_id in dst], dtype=numpy.int64)
+    w = numpy.array(weight, dtype=numpy.float64)
+
+    return node_ids, u, v, w
+
+
+class VectorizedMST:
+    """
+    Array implementation of the optimized MST algorithm.
+
+    With a diameter bound at least the true diameter, every node floods the
+    same maximum depth, so every stage starts and ends in the same round at
+    every node. A stage can then be applied to all nodes at once: broadcasts
+    and convergecasts become per-fragment reductions, and one-hop exchanges
+    become lookups through the reverse port of each directed edge. The round
+    in which a node handles each schedule item is known in closed form, which
+    gives the exact `rounds` and `awake_rounds` that `MSTNode` reports.
+
+    Ports are numbered per node in edge order, as `Network.load_edge_arrays`
+    numbers them, and coin flips come from `shared.coin_flip`. A run with the
+    same seed therefore matches the object simulator node for node.
+    """
+
+    def __init__(
+        self,
+        src: Iterable[Hashable],
+        dst: Iterable[Hashable],
+        weight: Iterable[float],
+        node_ids: Optional[Iterable[Hashable]] = None,
+        seed: int = None,
+        diameter: Optional[int] = DEFAULT_DIAMETER,
+        depth_update: DepthUpdate = DepthUpdate.FLOOD,
+        pipeline: Pipeline = Pipeline.PAPER,
+    ):
+        """
+        Build the port arrays of a graph given as parallel edge arrays.
+        :param src: The ID of the first endpoint of each edge.
+        :param dst: The ID of the second endpoint of each edge.
+        :param weight: The distinct weight of each edge.
+        :param node_ids: All node IDs in order, defaults to the endpoints in order of first appearance.
+        :param seed: The seed of the coin flips, drawn at random if not given.
+        :param diameter: A bound on the diameter, the rounds of depth flooding. Derived from the graph if None.
+        :param depth_update: How the nodes agree on the maximum depth after merging, as in `MSTNetwork`.
+        :param pipeline: Which stages run in every phase, as in `MSTNetwork`.
+        """
+        self.depth_update = depth_update
+        self.pipeline = pipeline
+        node_ids, u, v, w = edge_positions(src, dst, weight, node_ids)
+        self.build(node_ids, u, v, w, [0, len(node_ids)], [seed], [diameter])
+
+    def build(
+        self,
+        node_ids: List[Hashable],
+        u,
+        v,
+        w,
+        graph_offsets: List[int],
+        seeds: List[Optional[int]],
+        diameters: List[Optional[int]],
+    ):
+        """
+        Build the port arrays of one or more graphs laid out side by side.
+        :param node_ids: The ID of the node at every position.
+        :param u: The position of the first endpoint of each edge.
+        :param v: The position of the second endpoint of each edge.
+        :param w: The weight of each edge, distinct within each graph.
+        :param graph_offsets: Graph g holds the positions graph_offsets[g] to graph_offsets[g + 1] - 1.
+        :param seeds: The seed of the coin flips of each graph, drawn at random where None.
+        :param diameters: The diameter bound of each graph, derived from the graph where None.
+        """
+        n = len(node_ids)
+        m = len(w)
+
+        self.node_ids = node_ids
+        self.graph_offsets = numpy.asarray(graph_offsets, dtype=numpy.int64)
+        self.graph = numpy.repeat(
+            numpy.arange(len(graph_offsets) - 1), numpy.diff(self.graph_offsets)
+        )  # Graph of each node
+        self.seeds = [seed if seed is not None else random.getrandbits(64) for seed in seeds]
+
+        # Inputs of `shared.coin_flip` that never change, so flips are a few array operations
+        self.seed_states = numpy.array(
+            [mix(seed & MASK_64) for seed in self.seeds], dtype=numpy.uint64
+        )
+        self.node_keys = numpy.array(
+            [node_key(node_id) for node_id in node_ids], dtype=numpy.uint64
+        )
+
+        if numpy.any(u == v):
+            raise ValueError("The graph must not contain self-loops.")
+        if len(numpy.unique(numpy.minimum(u, v) * n + numpy.maximum(u, v))) != m:
+            raise ValueError("The graph must not contain duplicate edges.")
+
+        edge_graph = self.graph[u]
+        if numpy.any(edge_graph != self.graph[v]):
+            raise ValueError("Edges must not join nodes of different graphs.")
+        order = numpy.lexsort((w, edge_graph))
+        if numpy.any(
+            (edge_graph[order][1:] == edge_graph[order][:-1]) & (w[order][1:] == w[order][:-1])
+        ):
+            raise ValueError("The edge weights must be distinct.")
+
+        self.n = n
+        self.edge_src = u
+        self.edge_dst = v
+        self.edge_weight = w
+        self.forest = None  # Edges of the minimum spanning forest, found on first use
+
+        # Directed ports: 2k is edge k seen from u and 2k + 1 is edge k seen from v.
+        # A stable sort by owner numbers each node's ports in edge order.
+        owner = numpy.empty(2 * m, dtype=numpy.int64)
+        owner[0::2], owner[1::2] = u, v
+        order = numpy.argsort(owner, kind="stable")
+
+        inverse = numpy.empty_like(order)
+        inverse[order] = numpy.arange(2 * m)
+
+        self.port_node = owner[order]  # Node owning each port
+        self.port_neighbor = numpy.where(order % 2 == 0, v[order // 2], u[order // 2])
+        self.port_weight = w[order // 2]
+        self.port_edge = order // 2
+        self.reverse = inverse[order ^ 1]  # Port of the same edge at the neighbor
+
+        degree = numpy.bincount(self.port_node, minlength=n)
+        self.offsets = numpy.concatenate(([0], numpy.cumsum(degree)))
+
+        # Rounds of depth flooding in each graph
+        if None in diameters:
+            bounds = self.diameter_bounds()
+            diameters = [
+                bound if diameter is None else diameter
+                for bound, diameter in zip(bounds, diameters)
+            ]
+        self.diameter = numpy.array(diameters, dtype=numpy.int64)
+
+        self.initialize()
+
+    @classmethod
+    def from_networkx(
+        cls,
+        G,
+        seed: int = None,
+        diameter: Optional[int] = DEFAULT_DIAMETER,
+        depth_update: DepthUpdate = DepthUpdate.FLOOD,
+        pipeline: Pipeline = Pipeline.PAPER,
+    ):
+        """
+        Create the engine from a weighted NetworkX graph.
+        :param G: The graph, with a "weight" attribute on every edge.
+        :param seed: The seed of the coin flips.
+        :param diameter: A bound on the diameter, derived from the graph if None.
+        :param depth_update: How the nodes agree on the maximum depth after merging.
+        :param pipeline: Which stages run in every phase.
+        """
+        src, dst, weight = [], [], []
+        for u, v, data in G.edges(data=True):
+            src.append(u)
+            dst.append(v)
+            weight.append(data["weight"])
+
+        return cls(
+            src,
+            dst,
+            weight,
+            node_ids=G.nodes,
+            seed=seed,
+            diameter=diameter,
+            depth_update=depth_update,
+            pipeline=pipeline,
+        )
+
+    def initialize(self):
+        """Put every node back in its initial state, a single-node fragment of level 0."""
+        n = self.n
+        graphs = len(self.seeds)
+
+        self.parent = numpy.full(n, -1, dtype=numpy.int64)  # Port to the parent, -1 at roots
+        self.i = numpy.zeros(n, dtype=numpy.int64)  # Distance to the root
+        self.root = numpy.ones(n, dtype=bool)
+        self.fragment = numpy.arange(n)  # Position of the node that named the fragment
+        self.state = numpy.full(len(self.port_node), BASIC, dtype=numpy.int8)
+
+        self.coin_flips = numpy.zeros(n, dtype=numpy.int64)
+        self.awake_rounds = numpy.zeros(n, dtype=numpy.int64)
+        self.rounds = numpy.zeros(n, dtype=numpy.int64)
+
+        # Each graph keeps its own clock, and stops it once its MST is complete
+        self.running = numpy.ones(graphs, dtype=bool)
+        self.live = numpy.ones(n, dtype=bool)  # Whether the graph of each node is running
+        self.maximum_depth = numpy.ones(graphs, dtype=numpy.int64)
+        self.phase = numpy.ones(graphs, dtype=numpy.int64)
+        self.round_num = numpy.ones(graphs, dtype=numpy.int64)  # Round in which the next stage is entered
+        self.phase_fragment_depths = [[(1, 1)] for _ in range(graphs)]
+
+    def advance(self, length, awake):
+        """
+        Complete a stage entered in the current round of every running graph.
+        :param length: The number of rounds from the entry round to the END round, per graph.
+        :param awake: The rounds each node spends awake in the stage, entry and END included.
+        :return: The END round of the stage, per graph.
+        """
+        end = self.round_num + length
+        self.awake_rounds += numpy.where(self.live, awake, 0)
+        self.round_num = numpy.where(self.running, end + 1, self.round_num)
+        return end
+
+    def neighbor_maximum(self, values):
+        """Return, for every node, the maximum of `values` over its neighbors and itself."""
+        result = values.copy()
+        has_ports = self.offsets[1:] > self.offsets[:-1]
+        if self.port_neighbor.size:
+            neighbor_max = numpy.maximum.reduceat(
+                values[self.port_neighbor], self.offsets[:-1][has_ports]
+            )
+            result[has_ports] = numpy.maximum(result[has_ports], neighbor_max)
+        return result
+
+    def diameter_bounds(self) -> List[int]:
+        """
+        Return twice the eccentricity of the first node of each graph, a bound on its diameter.
+
+        The same bound as `MSTNetwork.diameter_bound`, found by a breadth-first
+        search from the first node of every graph at once.
+        """
+        graphs = len(self.seeds)
+        first = self.graph_offsets[:-1][numpy.diff(self.graph_offsets) > 0]
+
+        reached = numpy.zeros(self.n, dtype=numpy.int64)
+        reached[first] = 1
+        eccentricity = numpy.zeros(graphs, dtype=numpy.int64)
+        while True:
+            step = self.neighbor_maximum(reached)
+            grew = numpy.zeros(graphs, dtype=numpy.int64)
+            numpy.maximum.at(grew, self.graph, step - reached)
+            if not grew.any():
+                break
+            eccentricity += grew
+            reached = step
+
+        if not reached.all():
+            raise ValueError("Every graph must be connected.")
+
+        return numpy.maximum(1, 2 * eccentricity).tolist()
+
+    def simulate(self):
+        """Run phases until the single remaining fragment of every graph terminates."""
+        n = self.n
+        graphs = len(self.seeds)
+        ports = numpy.arange(len(self.port_node))
+        port_node = self.port_node
+        port_neighbor = self.port_neighbor
+
+        while True:
+            depth = self.maximum_depth
+            broadcast_awake = numpy.where(self.root, 3, 4)
+
+            # Tree ports lead to the parent or to a child
+            tree = (self.parent[port_node] == ports) | (
+                self.parent[port_neighbor] == self.reverse
+            )
+
+            # FIND_MOE
+            self.advance(depth + 2, broadcast_awake)
+
+            # UPCAST_MOE: lightest non-tree, non-rejected port of every node
+            candidates = numpy.flatnonzero(~tree & (self.state != REJECTED))
+            candidates = candidates[
+                numpy.lexsort(
+                    (candidates, self.port_weight[candidates], port_node[candidates])
+                )
+            ]
+            owners = port_node[candidates]
+            first = numpy.ones(len(candidates), dtype=bool)
+            first[1:] = owners[1:] != owners[:-1]
+
+            local_moe_port = numpy.full(n, -1, dtype=numpy.int64)
+            local_moe_port[owners[first]] = candidates[first]
+            local_weight = numpy.full(n, numpy.inf)
+            local_weight[owners[first]] = self.port_weight[candidates[first]]
+
+            fragment_moe = numpy.full(n, numpy.inf)
+            numpy.minimum.at(fragment_moe, self.fragment, local_weight)
+            moe = fragment_moe[self.fragment]
+            self.advance(depth + 4, 4)
+
+            # BROADCAST_MOE: a graph whose fragment has no MOE is complete
+            end = self.advance(depth + 2, broadcast_awake)
+            terminate = numpy.isinf(moe) & self.live
+            if terminate.any():
+                terminating = numpy.bincount(self.graph[terminate], minlength=graphs)
+                finished = terminating > 0
+                if numpy.any(terminating[finished] != numpy.diff(self.graph_offsets)[finished]):
+                    raise ValueError("The graph must be connected.")
+
+                self.rounds[terminate] = end[self.graph[terminate]]
+                self.running &= ~finished
+                self.live &= ~terminate
+                if not self.running.any():
+                    return
+
+            live = self.live
+            is_fragment_moe = (local_moe_port >= 0) & (local_weight == moe) & live
+
+            # TRANSMIT_ADJACENT_MOE
+            self.advance(2, 3)
+
+            # COIN_FLIP_BROADCAST: every root flips for its fragment. A fused broadcast
+            # carried the flip with the MOE weight, so the stage does not run.
+            roots = numpy.flatnonzero(self.root & live)
+            graph = self.graph[roots]
+            value = mix_array(
+                mix_array(self.seed_states[graph] ^ self.node_keys[roots])
+                ^ self.phase[graph].astype(numpy.uint64)
+            )
+            fragment_head = numpy.zeros(n, dtype=bool)
+            fragment_head[self.fragment[roots]] = value >> numpy.uint64(63) == 0
+            self.coin_flips[roots] += 1
+            head = fragment_head[self.fragment]
+            if self.pipeline == Pipeline.PAPER:
+                self.advance(depth + 2, broadcast_awake)
+
+            # TRANSMIT_ADJACENT_FLIP: a TAIL fragment MOE leading to a HEAD fragment is valid.
+            # A fused exchange carried the flips with the MOE weights, so the stage does not run.
+            moe_neighbor = port_neighbor[local_moe_port]
+            valid = is_fragment_moe & ~head & head[moe_neighbor]
+            if self.pipeline != Pipeline.FUSED:
+                self.advance(2, 3)
+
+            # UPCAST_VALIDITY
+            fragment_valid = numpy.zeros(n, dtype=bool)
+            fragment_valid[self.fragment[valid]] = True
+            self.advance(depth + 4, 4)
+
+            # BROADCAST_VALIDITY
+            valid = fragment_valid[self.fragment]
+            self.advance(depth + 2, broadcast_awake)
+
+            # TRANSMIT_ADJACENT_STATE
+            joining = numpy.flatnonzero(is_fragment_moe & valid)  # The u_T of each merging fragment
+            self.state[local_moe_port[joining]] = BRANCH
+
+            # HEAD fragments accept the MOE of each adjacent TAIL fragment as a child edge
+            side = ~tree & live[port_node]
+            accepted = (
+                side
+                & head[port_node]
+                & ~head[port_neighbor]
+                & (self.port_weight == moe[port_neighbor])
+            )
+            self.state[accepted] = BRANCH
+
+            internal = side & (self.fragment[port_node] == self.fragment[port_neighbor])
+            self.state[internal] = REJECTED
+            self.advance(2, 3)
+
+            # MERGE_INITIAL and MERGE_FINAL: re-root every merging fragment at its u_T
+            self.advance(depth + 4, numpy.where(valid, 4, 2))
+            self.advance(depth + 2, numpy.where(valid, broadcast_awake, 2))
+            self.merge(joining, local_moe_port[joining], valid)
+
+            # UPDATE_SCHEDULE_DEPTH: a round of flooding per unit of the diameter bound,
+            # then the END round. Flooding on growth sends in the entry round, so the
+            # stage is a round shorter. Only the messages differ, which are not counted.
+            node_diameter = self.diameter[self.graph]
+            flooded = self.i
+            if self.depth_update == DepthUpdate.ON_GROWTH:
+                length, awake = self.diameter, node_diameter + 1
+            else:
+                length, awake = self.diameter + 1, node_diameter + 2
+            for offset in range(int(self.diameter[self.running].max())):
+                flooded = numpy.where(
+                    node_diameter > offset, self.neighbor_maximum(flooded), flooded
+                )
+
+            lowest = numpy.full(graphs, numpy.iinfo(numpy.int64).max)
+            numpy.minimum.at(lowest, self.graph, flooded)
+            highest = numpy.zeros(graphs, dtype=numpy.int64)
+            numpy.maximum.at(highest, self.graph, flooded)
+            if numpy.any((lowest != highest) & self.running):
+                raise ValueError(
+                    "Nodes flooded different maximum depths, the diameter bound is too small."
+                )
+            self.advance(length, awake)
+
+            self.maximum_depth = numpy.where(self.running, highest, self.maximum_depth)
+            self.phase += self.running
+            for graph in numpy.flatnonzero(self.running).tolist():
+                self.phase_fragment_depths[graph].append(
+                    (int(self.phase[graph]), int(self.maximum_depth[graph]))
+                )
+
+    def merge(self, joining, moe_ports, valid):
+        """
+        Attach every valid fragment below the HEAD node across its MOE.
+
+        The path from u_T to the old root is reversed, and every other node keeps
+        its parent and sits one level further from the new root than its parent.
+        :param joining: The u_T node of every merging fragment.
+        :param moe_ports: The MOE port of each u_T.
+        :param valid: Whether each node belongs to a merging fragment.
+        """
+        new_parent = self.parent.copy()
+        new_level = numpy.full(self.n, -1, dtype=numpy.int64)
+
+        neighbors = self.port_neighbor[moe_ports]
+        new_parent[joining] = moe_ports
+        new_level[joining] = self.i[neighbors] + 1
+
+        target = numpy.arange(self.n)  # New fragment of each fragment
+        target[self.fragment[joining]] = self.fragment[neighbors]
+
+        # Walk up from u_T, pointing each ancestor at the child it was reached from
+        current = joining
+        while current.size:
+            current = current[self.parent[current] >= 0]
+            up = self.parent[current]
+            ancestors = self.port_neighbor[up]
+            new_parent[ancestors] = self.reverse[up]
+            new_level[ancestors] = new_level[current] + 1
+            current = ancestors
+
+        # Everything else hangs one level below its parent, top down
+        rest = numpy.flatnonzero(valid & (new_level < 0))
+        rest = rest[numpy.argsort(self.i[rest], kind="stable")]
+        levels = self.i[rest]
+        for level in numpy.unique(levels).tolist():
+            nodes = rest[levels == level]
+            new_level[nodes] = new_level[self.port_neighbor[self.parent[nodes]]] + 1
+
+        self.fragment[valid] = target[self.fragment[valid]]
+        self.i[valid] = new_level[valid]
+        self.parent[valid] = new_parent[valid]
+        self.root[valid] = False
+
+    def graph_msts(self) -> List[Tuple[list, list]]:
+        """Return the BRANCH edges and the MST computed by Kruskal of every graph, each in the format of `MSTNetwork.get_mst`."""
+        msts = [([], []) for _ in self.seeds]
+
+        branch = numpy.unique(self.port_edge[self.state == BRANCH])
+        for index, edges in enumerate((branch, self.spanning_forest())):
+            u, v = self.edge_src[edges], self.edge_dst[edges]
+            for graph, source, destination in zip(self.graph[u].tolist(), u.tolist(), v.tolist()):
+                msts[graph][index].append(
+                    tuple(sorted((self.node_ids[source], self.node_ids[destination])))
+                )
+
+        for edges in msts:
+            for index in range(2):
+                edges[index].sort()
+
+        return msts
+
+    def spanning_forest(self):
+        """Return the indices of the edges in the minimum spanning forest, found by Kruskal."""
+        if self.forest is not None:
+            return self.forest
+
+        leader = list(range(self.n))
+
+        def find(x):
+            while leader[x] != x:
+                leader[x] = leader[leader[x]]
+                x = leader[x]
+            return x
+
+        edges = []
+        order = numpy.argsort(self.edge_weight, kind="stable")
+        for edge, u, v in zip(
+            order.tolist(), self.edge_src[order].tolist(), self.edge_dst[order].tolist()
+        ):
+            root_u, root_v = find(u), find(v)
+            if root_u != root_v:
+                leader[root_u] = root_v
+                edges.append(edge)
+
+        self.forest = numpy.array(edges, dtype=numpy.int64)
+        return self.forest
+
+    def graph_max_rounds(self, graph: int) -> int:
+        start, stop = self.graph_offsets[graph : graph + 2]
+        return int(self.rounds[start:stop].max())
+
+    def graph_max_awake_rounds(self, graph: int) -> int:
+        start, stop = self.graph_offsets[graph : graph + 2]
+        return int(self.awake_rounds[start:stop].max())
+
+    def get_mst(self):
+        """Return the BRANCH edges and the MST computed by Kruskal, in the format of `MSTNetwork.get_mst`."""
+        return self.graph_msts()[0]
+
+    def get_max_rounds(self):
+        return self.graph_max_rounds(0)
+
+    def get_max_awake_rounds(self):
+        return self.graph_max_awake_rounds(0)
+
+    def get_phase_fragment_depths(self):
+        return self.phase_fragment_depths[0]
+
+    def cross_check(self):
+        """
+        Run the object simulator on every graph with the same seed and compare the results.
+
+        Raises an AssertionError naming the first graph and quantity that differ.
+        """
+        from optimized.main import MSTNetwork
+
+        msts = self.graph_msts()
+        for graph, seed in enumerate(self.seeds):
+            start, stop = self.graph_offsets[graph : graph + 2].tolist()
+            node_ids = self.node_ids[start:stop]
+            edges = self.graph[self.edge_src] == graph
+
+            network = MSTNetwork.from_edge_arrays(
+                [self.node_ids[u] for u in self.edge_src[edges].tolist()],
+                [self.node_ids[v] for v in self.edge_dst[edges].tolist()],
+                self.edge_weight[edges],
+                node_ids=node_ids,
+                seed=seed,
+                scheduler=Scheduler.FAST_FORWARD,
+                diameter=int(self.diameter[graph]),
+                depth_update=self.depth_update,
+                pipeline=self.pipeline,
+            )
+            network.simulate_rounds()
+
+            expected = {
+                "MST": network.get_mst()[0],
+                "rounds": [node.rounds for node in network.nodes],
+                "awake_rounds": [node.awake_rounds for node in network.nodes],
+                "phase fragment depths": network.get_phase_fragment_depths(),
+            }
+            actual = {
+                "MST": msts[graph][0],
+                "rounds": self.rounds[start:stop].tolist(),
+                "awake_rounds": self.awake_rounds[start:stop].tolist(),
+                "phase fragment depths": self.phase_fragment_depths[graph],
+            }
+
+            for name, value in expected.items():
+                assert (
+                    actual[name] == value
+                ), f"The vectorized {name} of graph {graph} differ from the object simulator."
+
+
+class BatchedMST(VectorizedMST):
+    """
+    Many independent graphs, simulated together.
+
+    The graphs are laid out side by side in one set of port arrays, so the
+    graph with the most phases sets the number of array passes, however many
+    graphs there are. Each graph keeps its own depth and clock, and stops when
+    its own MST is complete. Results are per graph lists, in the order the
+    graphs were given.
+    """
+
+    def __init__(
+        self,
+        graphs: Iterable[tuple],
+        seed: Union[int, Sequence[Optional[int]], None] = None,
+        diameter: Union[int, Sequence[Optional[int]], None] = DEFAULT_DIAMETER,
+        depth_update: DepthUpdate = DepthUpdate.FLOOD,
+        pipeline: Pipeline = Pipeline.PAPER,
+    ):
+        """
+        Build the port arrays of a batch of graphs given as edge arrays.
+        :param graphs: A (src, dst, weight) or (src, dst, weight, node_ids) tuple per graph, as taken by `VectorizedMST`.
+        :param seed: The seed of every graph, or a list with the seed of each graph. Drawn at random per graph if not given.
+        :param diameter: The diameter bound of every graph, or a list with the bound of each graph. Derived per graph where None.
+        :param depth_update: How the nodes of every graph agree on the maximum depth after merging.
+        :param pipeline: Which stages run in every phase of every graph.
+        """
+        self.depth_update = depth_update
+        self.pipeline = pipeline
+        node_ids, u, v, w = [], [], [], []
+        graph_offsets = [0]
+
+        for graph in graphs:
+            graph_node_ids, graph_u, graph_v, graph_w = edge_positions(*graph)
+            node_ids.extend(graph_node_ids)
+            u.append(graph_u + graph_offsets[-1])
+            v.append(graph_v + graph_offsets[-1])
+            w.append(graph_w)
+            graph_offsets.append(len(node_ids))
+
+        count = len(graph_offsets) - 1
+        if seed is None or isinstance(seed, int):
+            seeds = [seed] * count
+        else:
+            seeds = list(seed)
+            if len(seeds) != count:
+                raise ValueError("There must be one seed per graph.")
+
+        if diameter is None or isinstance(diameter, int):
+            diameters = [diameter] * count
+        else:
+            diameters = list(diameter)
+            if len(diameters) != count:
+                raise ValueError("There must be one diameter bound per graph.")
+
+        empty = numpy.zeros(0, dtype=numpy.int64)
+        self.build(
+            node_ids,
+            numpy.concatenate(u) if u else empty,
+            numpy.concatenate(v) if v else empty,
+            numpy.concatenate(w) if w else empty.astype(numpy.float64),
+            graph_offsets,
+            seeds,
+            diameters,
+        )
+
+    @classmethod
+    def from_networkx(
+        cls,
+        graphs,
+        seed: Union[int, Sequence[Optional[int]], None] = None,
+        diameter: Union[int, Sequence[Optional[int]], None] = DEFAULT_DIAMETER,
+        depth_update: DepthUpdate = DepthUpdate.FLOOD,
+        pipeline: Pipeline = Pipeline.PAPER,
+    ):
+        """
+        Create the batch from weighted NetworkX graphs.
+        :param graphs: The graphs, with a "weight" attribute on every edge.
+        :param seed: The seed of every graph, or a list with the seed of each graph.
+        :param diameter: The diameter bound of every graph, or a list with the bound of each graph.
+        :param depth_update: How the nodes of every graph agree on the maximum depth after merging.
+        :param pipeline: Which stages run in every phase of every graph.
+        """
+        return cls(
+            (
+                (
+                    [u for u, _ in G.edges],
+                    [v for _, v in G.edges],
+                    [weight for _, _, weight in G.edges(data="weight")],
+                    G.nodes,
+                )
+                for G in graphs
+            ),
+            seed=seed,
+            diameter=diameter,
+            depth_update=depth_update,
+            pipeline=pipeline,
+        )
+
+    def __len__(self):
+        return len(self.seeds)
+
+    def get_mst(self):
+        """Return the BRANCH edges and the Kruskal MST of every graph."""
+        return self.graph_msts()
+
+    def get_max_rounds(self):
+        return [self.graph_max_rounds(graph) for graph in range(len(self))]
+
+    def get_max_awake_rounds(self):
+        return [self.graph_max_awake_rounds(graph) for graph in range(len(self))]
+
+    def get_phase_fragment_depths(self):
+        return self.phase_fragment_depths
@@ -1,4 +1,18 @@
+from .attribution import Attribution
 from .network import Network
 from .node import Node
+from .profiler import Profiler
+from .shared import PortBackend, Scheduler
+from .trace import Tracer, export_chrome_trace, read_trace
 
-__all__ = ["Network", "Node"]
+__all__ = [
+    "Attribution",
+    "Network",
+    "Node",
+    "PortBackend",
+    "Profiler",
+    "Scheduler",
+    "Tracer",
+    "export_chrome_trace",
+    "read_trace",
+]
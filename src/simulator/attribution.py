@@ -0,0 +1,181 @@
+import threading
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .hooks import wrap_nodes
+
+# (stage, procedure, transmission round), None where there is none
+Key = Tuple[Optional[Enum], Optional[Enum], Optional[Enum]]
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: Sequence[int], q: float) -> int:
+    """Return the nearest-rank q-th percentile of sorted values."""
+    if not values:
+        return 0
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+def label(member: Optional[Enum]) -> str:
+    return "-" if member is None else str(member.value)
+
+
+class Attribution:
+    """
+    Awake rounds of each node, attributed to what the node did in them.
+
+    Each awake round is counted under the stage the node woke up in and the
+    procedure and transmission round of the schedule item it handled, or
+    None for both when it handled none, such as a round running a stage's
+    entry logic. Like the profiler, it wraps the `compute` and `handle_stage`
+    methods of the attributed network's nodes for the duration of a run, see
+    `wrap_nodes`, so other networks run the unwrapped code.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.counts: List[Dict[tuple, int]] = []  # Per node position: ids of the key -> rounds
+        self.keys: Dict[tuple, Key] = {}  # ids of the key -> key, as Enum members hash slowly
+
+    def attributed_compute(self, function, positions: Dict):
+        attribution = self
+
+        def wrapper(node, round_number):
+            if node.sleeping and round_number < node.wake_round:
+                return function(node, round_number)
+
+            local = attribution.local
+            stage = getattr(node, "stage", None)
+            local.item = None
+
+            function(node, round_number)
+
+            procedure, transmission = local.item or (None, None)
+            ids = (id(stage), id(procedure), id(transmission))
+            counts = attribution.counts[positions[node]]
+            count = counts.get(ids)
+            if count is None:
+                attribution.keys.setdefault(ids, (stage, procedure, transmission))
+                counts[ids] = 1
+            else:
+                counts[ids] = count + 1
+
+        return wrapper
+
+    def noted_stage(self, function):
+        """Return a wrapper of `handle_stage` that notes the schedule item about to be handled."""
+        attribution = self
+
+        def wrapper(node, *args, **kwargs):
+            if node.schedule:
+                _, procedure, transmission = node.schedule[0]
+                attribution.local.item = (procedure, transmission)
+            return function(node, *args, **kwargs)
+
+        return wrapper
+
+    @contextmanager
+    def instrument(self, network):
+        """
+        Attribute the awake rounds of a network's nodes until the block exits.
+        :param network: The network whose run is attributed.
+        """
+        wrappers = {
+            "compute": lambda function: self.attributed_compute(function, network.positions),
+            "handle_stage": self.noted_stage,
+        }
+
+        self.counts = [{} for _ in network.nodes]
+
+        with wrap_nodes(network, wrappers):
+            yield self
+
+    def export(self, start: int, stop: int) -> List[Dict[Key, int]]:
+        """Return the histograms of the nodes at positions start..stop-1, to be merged elsewhere."""
+        return [self.histogram(position) for position in range(start, stop)]
+
+    def merge(self, start: int, histograms: List[Dict[Key, int]]):
+        """Replace the counts of the nodes from position `start` on with those returned by `export`."""
+        for position, histogram in enumerate(histograms, start):
+            counts = self.counts[position] = {}
+            for key, rounds in histogram.items():
+                ids = tuple(map(id, key))
+                self.keys.setdefault(ids, key)
+                counts[ids] = rounds
+
+    def histogram(self, position: int) -> Dict[Key, int]:
+        """Return the awake rounds of the node at a position per (stage, procedure, transmission round)."""
+        return {self.keys[ids]: rounds for ids, rounds in self.counts[position].items()}
+
+    def busiest(self) -> Tuple[int, int]:
+        """Return the position of the node awake for the most rounds, and its awake rounds."""
+        totals = [sum(counts.values()) for counts in self.counts]
+        position = max(range(len(totals)), key=totals.__getitem__)
+        return position, totals[position]
+
+    def table(
+        self, percentiles: Sequence[float] = PERCENTILES
+    ) -> List[Tuple[Key, int, List[int], int]]:
+        """
+        Return one (key, total rounds, percentiles, max) row per key, largest total first.
+        :param percentiles: The percentiles of the per-node rounds reported, taken over every node.
+        """
+        per_key: Dict[tuple, List[int]] = {}
+        for counts in self.counts:
+            for ids, rounds in counts.items():
+                per_key.setdefault(ids, []).append(rounds)
+
+        n = len(self.counts)
+        rows = []
+        for ids, values in per_key.items():
+            # Nodes that never spent a round on the key count as 0
+            values = [0] * (n - len(values)) + sorted(values)
+            quantiles = [percentile(values, q) for q in percentiles]
+            rows.append((self.keys[ids], sum(values), quantiles, values[-1]))
+
+        return sorted(rows, key=lambda row: -row[1])
+
+    def format_report(
+        self, node_ids: Optional[Sequence] = None, percentiles: Sequence[float] = PERCENTILES
+    ) -> str:
+        """
+        Return the totals, the histogram of the busiest node and the table as aligned text.
+        :param node_ids: The ID of the node at each position, shown for the busiest node.
+        :param percentiles: The percentiles of the per-node rounds reported.
+        """
+        rows = self.table(percentiles)
+        total = sum(row[1] for row in rows)
+        end = sum(
+            row[1] for row in rows if row[0][2] is not None and row[0][2].name == "END"
+        )
+        entry = sum(row[1] for row in rows if row[0][1] is None)
+
+        position, busiest = self.busiest()
+        node = node_ids[position] if node_ids is not None else position
+
+        lines = [
+            f"Awake rounds: {total}, {total - end - entry} work, {end} END transitions,"
+            f" {entry} without a schedule item",
+            f"Busiest node: {node} with {busiest} awake rounds",
+        ]
+        histogram = sorted(self.histogram(position).items(), key=lambda item: -item[1])
+        for (stage, procedure, transmission), rounds in histogram:
+            lines.append(
+                f"  {label(stage):<26} {label(procedure):<26} {label(transmission):<18} {rounds:>8}"
+            )
+
+        header = "".join(f"{f'p{q:g}':>8}" for q in percentiles)
+        lines.append(
+            f"{'stage':<26} {'procedure':<26} {'transmission':<18} {'total':>10}{header} {'max':>8}"
+        )
+        for (stage, procedure, transmission), rounds, values, maximum in rows:
+            quantiles = "".join(f"{value:>8}" for value in values)
+            lines.append(
+                f"{label(stage):<26} {label(procedure):<26} {label(transmission):<18}"
+                f" {rounds:>10}{quantiles} {maximum:>8}"
+            )
+
+        return "\n".join(lines)
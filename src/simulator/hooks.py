@@ -0,0 +1,102 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+
+class Hook:
+    """
+    The per-network replacements of one attribute of a node class.
+
+    The class holds a dispatcher instead of the attribute, which looks up
+    the replacement of the network of the node it is called on and falls
+    back to the original. A table of handlers, such as `PROCEDURES`, gets
+    one dispatcher per handler.
+    """
+
+    def __init__(self, cls: type, name: str):
+        self.cls = cls
+        self.name = name
+        self.own = name in cls.__dict__  # Whether the class defines it, rather than inherit it
+        self.original = getattr(cls, name)
+        self.networks: Dict[int, object] = {}  # id of a network -> its replacement
+
+    def dispatcher(self):
+        original = self.original
+        networks = self.networks
+
+        def dispatch(node, *args, **kwargs):
+            return networks.get(id(node.network), original)(node, *args, **kwargs)
+
+        return dispatch
+
+    def handler_dispatcher(self, key):
+        original = self.original
+        networks = self.networks
+
+        def dispatch(node, *args, **kwargs):
+            return networks.get(id(node.network), original)[key](node, *args, **kwargs)
+
+        return dispatch
+
+    def install(self):
+        if isinstance(self.original, dict):
+            dispatch = {key: self.handler_dispatcher(key) for key in self.original}
+        else:
+            dispatch = self.dispatcher()
+        setattr(self.cls, self.name, dispatch)
+
+    def uninstall(self):
+        if self.own:
+            setattr(self.cls, self.name, self.original)
+        else:
+            delattr(self.cls, self.name)
+
+
+_lock = threading.Lock()
+_hooks: Dict[Tuple[type, str], Hook] = {}
+
+
+@contextmanager
+def wrap_nodes(network, wrappers: Dict[str, Callable]):
+    """
+    Replace attributes of the classes of a network's nodes, for that network's nodes only.
+
+    Each wrapper is given the attribute as that network sees it, the original
+    or the replacement of a block still open around this one, and returns the
+    replacement. Nodes of other networks, run from other threads included,
+    keep seeing their own. The classes are restored once no network needs
+    them replaced, so a run without instrumentation runs the unwrapped code.
+    :param network: The network whose nodes see the replacements until the block exits.
+    :param wrappers: Attribute name -> wrapper. Classes without the attribute are skipped.
+    """
+    key = id(network)
+    applied = []
+
+    with _lock:
+        for cls in {type(node) for node in network.nodes}:
+            for name, wrap in wrappers.items():
+                if not hasattr(cls, name):
+                    continue
+
+                hook = _hooks.get((cls, name))
+                if hook is None:
+                    hook = _hooks[(cls, name)] = Hook(cls, name)
+                    hook.install()
+
+                previous = hook.networks.get(key)
+                hook.networks[key] = wrap(hook.original if previous is None else previous)
+                applied.append((hook, previous))
+
+    try:
+        yield
+    finally:
+        with _lock:
+            for hook, previous in reversed(applied):
+                if previous is None:
+                    del hook.networks[key]
+                else:
+                    hook.networks[key] = previous
+
+                if not hook.networks:
+                    hook.uninstall()
+                    del _hooks[(hook.cls, hook.name)]
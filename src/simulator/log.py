@@ -0,0 +1,45 @@
+import logging
+
+LOGGER_NAME = "simulator"
+
+
+class NullLogger:
+    """Stand-in for a node's logger when verbose output is disabled, every call is a no-op."""
+
+    __slots__ = ()
+
+    def debug(self, *args, **kwargs):
+        pass
+
+    info = warning = error = exception = critical = log = debug
+
+
+NULL_LOGGER = NullLogger()
+
+
+def get_logger() -> logging.Logger:
+    """Return the logger shared by every network and node, attaching its handler once."""
+    logger = logging.getLogger(LOGGER_NAME)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter(
+            "Node %(node_id)s - %(levelname)s - %(message)s"
+        )
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+
+    return logger
+
+
+def get_node_logger(node_id, verbose: bool = False):
+    """
+    Return the logger for a node, tagging every record with the node's ID.
+    :param node_id: The ID of the node.
+    :param verbose: Whether logging is enabled, when it is not a shared no-op logger is returned.
+    """
+    if not verbose:
+        return NULL_LOGGER
+
+    return logging.LoggerAdapter(get_logger(), {"node_id": node_id})
@@ -1,36 +1,210 @@
-from typing import List, Tuple
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from time import perf_counter_ns
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
 
+from .attribution import Attribution
 from .node import Node
+from .parallel import simulate_multiprocess
+from .profiler import Profiler
+from .trace import Tracer
+from .traffic import Traffic
+from .threaded import MIN_PARALLEL_NODES, ThreadedCompute, gil_enabled
+from .wake_calendar import WakeCalendar
+from .ports import TOPOLOGY_KEYS, EdgeList, PortTable, compact_column
+from .shared import PortBackend, Scheduler
 
 
-class Network:
-    def __init__(self, verbose: bool = False):
+class Network(ABC):
+    # Attributes maintained by `end_round` that the multi-process scheduler copies back
+    round_state: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        verbose: bool = False,
+        scheduler: Scheduler = Scheduler.SEQUENTIAL,
+        port_backend: PortBackend = PortBackend.DICT,
+        workers: Optional[int] = None,
+        profile: bool = False,
+        trace: Optional[str] = None,
+        attribute: bool = False,
+        count_messages: bool = True,
+    ):
         self.nodes: List[Node] = []  # List of Node instances
         self.edges: List[Tuple[Node, Node, dict]] = (
             []
         )  # List of edges as tuples (u, v, attributes)
         self.verbose = verbose
+        self.scheduler = scheduler
+        self.port_backend = port_backend
+        self.workers = workers  # Worker processes or threads of the parallel schedulers
+        self.profiler: Optional[Profiler] = Profiler() if profile else None
+        self.tracer: Optional[Tracer] = Tracer(trace) if trace else None  # Awake timeline file
+        self.attribution: Optional[Attribution] = Attribution() if attribute else None
+        # Messages and bits sent per round and stage, recorded by the nodes
+        self.traffic: Optional[Traffic] = Traffic() if count_messages else None
+        self.port_table: Optional[PortTable] = None  # Set by the CSR bulk loader
+        self.edge_defaults: dict = {}  # Attributes shared by every edge of the CSR port table
+
+        # Position of each node in `self.nodes`, used to keep the compute order
+        # of the event-driven scheduler identical to the sequential one
+        self.positions: Dict[Node, int] = {}
+
+        # Indexes for constant time membership checks while building the graph
+        self.node_index: Dict[Hashable, Node] = {}  # node ID -> Node
+        self.edge_index: Dict[FrozenSet[Hashable], Tuple[Node, Node, dict]] = {}
+
+        # Nodes with a non-empty staging inbox, registered by `Node.send_message`
+        self.pending_delivery: List[Node] = []
+
+        self.round_num: int = 0  # Round currently being simulated
+        self.active_nodes: int = 0  # Number of nodes that have not terminated
+        self.lock = threading.Lock()  # Guards the counters updated by nodes during a round
 
         self.phase_fragment_depths = []
 
+    @classmethod
+    def from_edge_arrays(
+        cls,
+        src: Iterable[Hashable],
+        dst: Iterable[Hashable],
+        weight: Iterable[float],
+        node_ids: Optional[Iterable[Hashable]] = None,
+        **kwargs,
+    ):
+        """
+        Create a network from parallel arrays of edge endpoints and weights.
+        :param src: The ID of the first endpoint of each edge.
+        :param dst: The ID of the second endpoint of each edge.
+        :param weight: The weight of each edge.
+        :param node_ids: All node IDs in order, defaults to the endpoints in order of first appearance.
+        :param kwargs: Keyword arguments passed on to the network constructor.
+        """
+        network = cls(**kwargs)
+        network.load_edge_arrays(src, dst, weight, node_ids)
+        return network
+
+    @abstractmethod
+    def create_node(self, node_id: Hashable, n: int) -> Node:
+        """Create the node with the given ID for a graph of n nodes, used by the bulk loader."""
+        pass
+
+    def load_edge_arrays(
+        self,
+        src: Iterable[Hashable],
+        dst: Iterable[Hashable],
+        weight: Iterable[float],
+        node_ids: Optional[Iterable[Hashable]] = None,
+        **attributes,
+    ):
+        """
+        Build all nodes and ports from parallel edge arrays in a single linear pass.
+        :param src: The ID of the first endpoint of each edge.
+        :param dst: The ID of the second endpoint of each edge.
+        :param weight: The weight of each edge.
+        :param node_ids: All node IDs in order, defaults to the endpoints in order of first appearance.
+        :param attributes: Attributes shared by every edge, copied into each port.
+        """
+        # Plain Python values are much faster to hash and compare than NumPy scalars
+        src, dst, weight = (
+            array.tolist() if hasattr(array, "tolist") else list(array)
+            for array in (src, dst, weight)
+        )
+
+        if not len(src) == len(dst) == len(weight):
+            raise ValueError("The edge arrays must all have the same length.")
+
+        if node_ids is None:
+            node_ids = dict.fromkeys(node_id for pair in zip(src, dst) for node_id in pair)
+        elif hasattr(node_ids, "tolist"):
+            node_ids = node_ids.tolist()
+
+        node_ids = list(node_ids)
+        n = len(node_ids)
+
+        if self.port_backend == PortBackend.CSR:
+            self._load_port_table(node_ids, src, dst, weight, attributes)
+            return
+
+        for node_id in node_ids:
+            self.add_node(self.create_node(node_id, n))
+
+        node_index = self.node_index
+        for u_id, v_id, w in zip(src, dst, weight):
+            self.add_edge(node_index[u_id], node_index[v_id], weight=w, **attributes)
+
+    def _load_port_table(
+        self,
+        node_ids: List[Hashable],
+        src: List[Hashable],
+        dst: List[Hashable],
+        weight: List[float],
+        attributes: dict,
+    ):
+        """Build the nodes and a shared CSR port table in place of per-node port dictionaries."""
+        if self.nodes:
+            raise ValueError("The CSR port table can only be loaded into an empty network.")
+
+        n = len(node_ids)
+        for node_id in node_ids:
+            self.add_node(self.create_node(node_id, n))
+
+        positions = {node_id: position for position, node_id in enumerate(node_ids)}
+        src = [positions[u_id] for u_id in src]
+        dst = [positions[v_id] for v_id in dst]
+
+        seen = set()
+        for u, v in zip(src, dst):
+            key = (u, v) if u < v else (v, u)
+            if key in seen:
+                raise ValueError(
+                    f"Edge between Node {node_ids[u]} and Node {node_ids[v]} already exists."
+                )
+            seen.add(key)
+
+        m = len(src)
+        columns = {"weight": weight}
+        for key, value in attributes.items():
+            columns[key] = [value] * m
+
+        self.edge_defaults = attributes
+        self.port_table = PortTable(self.nodes, src, dst, columns)
+        self.edges = EdgeList(self.port_table)
+
+        for position, node in enumerate(self.nodes):
+            node.ports = self.port_table.ports(position)
+
     def add_node(self, node: Node):
         """Add a node to the network."""
-        if node not in self.nodes:
+        if node.node_id not in self.node_index:
+            self.node_index[node.node_id] = node
+            self.positions[node] = len(self.nodes)
             self.nodes.append(node)
+            node.network = self
+
+            if not node.terminated:
+                self.active_nodes += 1
         else:
             raise ValueError(f"Node {node.node_id} already exists in the network.")
 
     def add_edge(self, u: Node, v: Node, **attributes):
         """Add an edge between two nodes u and v with optional attributes."""
-        if u not in self.nodes or v not in self.nodes:
+        if u not in self.positions or v not in self.positions:
             raise ValueError("Both nodes must exist in the network to create an edge.")
 
-        edge = (u, v, attributes)
-        if edge in self.edges or (v, u, attributes) in self.edges:
+        if self.port_table is not None:
+            raise ValueError("Edges cannot be added to a network with a CSR port table.")
+
+        key = frozenset((u.node_id, v.node_id))
+        if key in self.edge_index:
             raise ValueError(
                 f"Edge between Node {u.node_id} and Node {v.node_id} already exists."
             )
 
+        edge = (u, v, attributes)
+        self.edge_index[key] = edge
         self.edges.append(edge)
         self.update_ports(u, v, attributes)
 
@@ -55,40 +229,259 @@ class Network:
             **attributes,
         }
 
-    def deliver_messages(self):
-        """Merge the staging inbox into the inbox for all nodes."""
+    def reset(self):
+        """
+        Restore every node and edge to its state before the first round.
+
+        Nodes, ports and the CSR port table are kept and overwritten in place,
+        in one pass over the nodes and one over the edges, so the same graph
+        can be simulated again without being rebuilt.
+        """
+        self.pending_delivery.clear()
+        self.round_num = 0
+        if self.traffic is not None:
+            self.traffic.clear()
+
         for node in self.nodes:
+            node.reset()
+        self.active_nodes = sum(1 for node in self.nodes if not node.terminated)
+
+        if self.port_table is not None:
+            columns = self.port_table.columns
+            m = len(self.port_table.src)
+
+            # Drop the columns of attributes added during the run
+            added = [key for key in columns if key != "weight" and key not in self.edge_defaults]
+            for key in added:
+                del columns[key]
+            for key, value in self.edge_defaults.items():
+                columns[key] = compact_column([value] * m)
+            return
+
+        # Ports were numbered in the order the edges were added, see `update_ports`
+        next_port = dict.fromkeys(self.nodes, 0)
+        for u, v, attributes in self.edges:
+            for node in (u, v):
+                port_id = next_port[node]
+                next_port[node] = port_id + 1
+                port = node.ports[port_id]
+
+                # Drop attributes added during the run
+                if len(port) != len(attributes) + len(TOPOLOGY_KEYS):
+                    for key in [key for key in port if key not in TOPOLOGY_KEYS]:
+                        del port[key]
+                port.update(attributes)
+
+    def deliver_messages(self):
+        """Merge the staging inbox into the inbox for the nodes that received messages this round."""
+        for node in self.pending_delivery:
             # Use list extend to append staging inbox messages to the main inbox
             node.inbox.extend(node.staging_inbox)
 
             # Clear the staging inbox after merging
             node.staging_inbox.clear()
 
+        self.pending_delivery.clear()
+
     def simulate_rounds(self):
         """Simulate multiple synchronous communication rounds."""
+        with ExitStack() as stack:
+            if self.profiler is not None:
+                stack.enter_context(self.profiler.instrument(self))
+            if self.tracer is not None:
+                stack.enter_context(self.tracer.record(self))
+            if self.attribution is not None:
+                stack.enter_context(self.attribution.instrument(self))
+
+            self._simulate()
+
+    def _simulate(self):
+        if self.scheduler == Scheduler.EVENT_DRIVEN:
+            self._simulate_event_driven()
+        elif self.scheduler == Scheduler.FAST_FORWARD:
+            self._simulate_event_driven(fast_forward=True)
+        elif self.scheduler == Scheduler.MULTIPROCESS:
+            simulate_multiprocess(self, self.workers)
+        elif self.scheduler == Scheduler.THREADED:
+            if gil_enabled():
+                # Threads would only take turns, so run the same rounds on one thread
+                self._simulate_event_driven(fast_forward=True)
+            else:
+                with ThreadPoolExecutor(self.workers) as pool:
+                    self._simulate_event_driven(
+                        fast_forward=True, threaded=ThreadedCompute(pool, self.workers)
+                    )
+        else:
+            self._simulate_sequential()
+
+    def get_traffic(self) -> Traffic:
+        """Return the messages and bits counted by the nodes of a run."""
+        if self.traffic is None:
+            raise ValueError("The network was created with count_messages=False.")
+        return self.traffic
+
+    def get_profile(self) -> List[Tuple[str, str, int, float]]:
+        """Return the (category, name, calls, seconds) rows recorded by a profiled run."""
+        if self.profiler is None:
+            raise ValueError("The network was not created with profile=True.")
+        return self.profiler.table()
+
+    def get_awake_attribution(self) -> list:
+        """Return the ((stage, procedure, transmission round), total, percentiles, max) rows of an attributed run."""
+        if self.attribution is None:
+            raise ValueError("The network was not created with attribute=True.")
+        return self.attribution.table()
+
+    def get_awake_report(self) -> str:
+        """Return the awake rounds of an attributed run per stage and procedure, as aligned text."""
+        if self.attribution is None:
+            raise ValueError("The network was not created with attribute=True.")
+        return self.attribution.format_report([node.node_id for node in self.nodes])
+
+    def end_round(self, round_num: int):
+        """
+        Hook called once every scheduled node has computed and slept in a round.
+
+        The multi-process scheduler calls it in the worker that owns the first
+        node, only for rounds in which that worker had a node due, and copies
+        the attributes named in `round_state` back at the end.
+        """
+        pass
+
+    def node_terminated(self, node: Node):
+        """Record that a node terminated in the current round."""
+        with self.lock:
+            self.active_nodes -= 1
+        node.rounds = self.round_num
+
+    def node_resumed(self, node: Node):
+        """Record that a terminated node became active again."""
+        with self.lock:
+            self.active_nodes += 1
+        node.rounds = 0
+
+    def check_termination(self) -> bool:
+        """Return whether all nodes have terminated."""
+        return self.active_nodes == 0
+
+    def _simulate_sequential(self):
+        """Run every node in every round, whether it is asleep or not."""
         round_num = 1
         terminated = False
+        profiler = self.profiler
 
         while terminated is False:
             if self.verbose:
                 print(f"\n--- Simulating Round {round_num} ---")
 
+            self.round_num = round_num
+            if profiler is not None:
+                start = perf_counter_ns()
+
             # 1. Perform computation for all nodes
             for node in self.nodes:
                 node.compute(round_number=round_num)
 
+            if profiler is not None:
+                computed = perf_counter_ns()
+
             # 2. Deliver messages from outboxes to inboxes
             self.deliver_messages()
 
             for node in self.nodes:
                 node.finalize_sleep(round_num)
 
-            terminated = True
-            for node in self.nodes:
-                if node.terminated is False:
-                    terminated = False
-                    break
-                elif node.rounds == 0:
-                    node.rounds = round_num
+            if profiler is not None:
+                profiler.add_round(
+                    round_num, len(self.nodes), computed - start, perf_counter_ns() - computed
+                )
+
+            self.end_round(round_num)
+            terminated = self.check_termination()
+
+            round_num += 1
+
+    def _simulate_event_driven(
+        self, fast_forward: bool = False, threaded: Optional[ThreadedCompute] = None
+    ):
+        """
+        Only run the nodes that are awake or due to wake up in each round.
+
+        Sleeping nodes are kept in a calendar of buckets keyed by their wake
+        round. A node that is not due in a round would return immediately from
+        `compute()` and `finalize_sleep()` would leave it unchanged, so skipping
+        it reports exactly the same `rounds` and `awake_rounds` values.
+        :param fast_forward: Jump straight to the next wake round when every node
+            sleeps, without calling `end_round` for the skipped rounds.
+        :param threaded: Compute rounds with many due nodes on this thread pool.
+        """
+        round_num = 1
+        terminated = False
+        profiler = self.profiler
+
+        awake: List[Node] = []
+        calendar = WakeCalendar()
+
+        for node in self.nodes:
+            if node.sleeping:
+                calendar.add(node)
+            else:
+                awake.append(node)
+
+        while terminated is False:
+            if fast_forward and not awake:
+                round_num = calendar.next_round()
+                if round_num is None:
+                    raise RuntimeError("Every active node is asleep with no wake round.")
+
+            if self.verbose:
+                print(f"\n--- Simulating Round {round_num} ---")
+
+            self.round_num = round_num
+            if profiler is not None:
+                start = computed = perf_counter_ns()
+
+            # 1. Perform computation for the nodes that are awake this round,
+            # in the same order as the sequential scheduler
+            due = awake
+            waking = calendar.pop(round_num)
+            if waking:
+                due = sorted(due + waking, key=self.positions.__getitem__)
+
+            if threaded is not None and len(due) >= MIN_PARALLEL_NODES:
+                # Messages are delivered as the chunks complete, so it all counts as compute
+                awake, sleeping = threaded.run(self, due, round_num)
+                for node in sleeping:
+                    calendar.add(node)
+
+                if profiler is not None:
+                    computed = perf_counter_ns()
+            else:
+                for node in due:
+                    node.compute(round_number=round_num)
+
+                if profiler is not None:
+                    computed = perf_counter_ns()
+
+                # 2. Deliver messages from outboxes to inboxes
+                self.deliver_messages()
+
+                # 3. Put nodes to sleep and file them under their wake round
+                awake = []
+                for node in due:
+                    node.finalize_sleep(round_num)
+
+                    if node.sleeping:
+                        calendar.add(node)
+                    else:
+                        awake.append(node)
+
+            if profiler is not None:
+                profiler.add_round(
+                    round_num, len(due), computed - start, perf_counter_ns() - computed
+                )
+
+            self.end_round(round_num)
+            terminated = self.check_termination()
 
             round_num += 1
@@ -1,39 +1,76 @@
 from abc import ABC, abstractmethod
 from typing import Tuple, List, Dict
-import logging
+
+from .log import get_node_logger
+
+# Attributes that link a node to the rest of the network rather than hold its own state
+NODE_LINKS = ("network", "ports", "logger")
 
 
 class Node(ABC):
+    __slots__ = (
+        "node_id",
+        "verbose",
+        "logger",
+        "ports",
+        "inbox",
+        "staging_inbox",
+        "network",
+        "sleeping",
+        "wake_round",
+        "deferred_sleep",
+        "_terminated",
+        "awake_rounds",
+        "rounds",
+        "outbox",
+    )
+
     def __init__(self, node_id: int, verbose: bool = False):
         self.node_id = node_id
 
-        self.logger = logging.getLogger(f"Node {self.node_id}")
-        log_level = logging.DEBUG if verbose else logging.WARNING
-        self.logger.setLevel(log_level)
-
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter("%(name)s - %(levelname)s - %(message)s")
-        handler.setFormatter(formatter)
-
-        self.logger.addHandler(handler)
+        self.verbose = verbose
+        self.logger = get_node_logger(node_id, verbose)
 
         self.ports: Dict[int, Dict] = (
             {}
         )  # Ports dictionary (port ID -> edge attributes)
+        self.network = None  # Network this node belongs to, set by `Network.add_node`
+
+        self.reset()
+
+    def reset(self):
+        """Restore the node to its state before the first round, keeping its ports and network."""
         self.inbox: List[Tuple[int, str]] = (
             []
         )  # List of incoming messages (port_id, message)
         self.staging_inbox: List[Tuple[int, str]] = []
+        self.outbox: list = None  # Buffer for outgoing messages, set by the threaded scheduler
 
         self.sleeping: bool = False
         self.wake_round: int = 1
         self.deferred_sleep: int = (
             -1
         )  # Round in which the node will sleep after processing
-        self.terminated: bool = False
+        self._terminated: bool = False
         self.awake_rounds: int = 0
         self.rounds: int = 0
 
+    @property
+    def terminated(self) -> bool:
+        """Whether the node has terminated."""
+        return self._terminated
+
+    @terminated.setter
+    def terminated(self, value: bool):
+        """Record the change with the network so it can track termination without scanning."""
+        if value != self._terminated and self.network is not None:
+            if value:
+                self.network.node_terminated(self)
+            else:
+                self.network.node_resumed(self)
+
+        self._terminated = value
+
     def __repr__(self):
         return f"Node(node_id={self.node_id}, ports={len(self.ports)})"
 
@@ -42,8 +79,21 @@ class Node(ABC):
         if port_id not in self.ports:
             raise ValueError(f"Invalid port ID {port_id} for Node {self.node_id}.")
 
-        destination: Node = self.ports[port_id]["destination"]
-        destination_port: int = self.ports[port_id]["destination_port"]
+        if type(self.ports) is dict:
+            destination: Node = self.ports[port_id]["destination"]
+            destination_port: int = self.ports[port_id]["destination_port"]
+        else:
+            # Compact port table, see `simulator.ports`
+            destination, destination_port = self.ports.route(port_id)
+
+        # Other threads may be computing the destination, so stage at the barrier instead
+        if self.outbox is not None:
+            self.outbox.append((destination, destination_port, message))
+            return
+
+        # The first message staged for a node this round marks it for delivery
+        if not destination.staging_inbox and self.network is not None:
+            self.network.pending_delivery.append(destination)
 
         # (port, message) where its the port that connects them to this node
         destination.staging_inbox.append((destination_port, message))
@@ -77,6 +127,23 @@ class Node(ABC):
         self._compute(round_number)
         self.awake_rounds += 1
 
+    def export_state(self) -> Dict:
+        """Return the node's own state, without the links to its network, ports and logger."""
+        state = {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if name not in NODE_LINKS and hasattr(self, name)
+        }
+        if hasattr(self, "__dict__"):
+            state.update(vars(self))
+        return state
+
+    def import_state(self, state: Dict):
+        """Overwrite the node's own state with one returned by `export_state`."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
     @abstractmethod
     def _compute(self, round_number: int):
         """Abstract method to be implemented by subclasses."""
@@ -0,0 +1,350 @@
+import multiprocessing
+import os
+import traceback
+from bisect import bisect_right
+from time import perf_counter_ns
+from typing import Dict, List, Optional, Tuple
+
+from .node import Node
+from .ports import TOPOLOGY_KEYS
+from .wake_calendar import WakeCalendar
+
+# Messages staged for one shard: (position of the destination, messages in staging order)
+Batch = List[Tuple[int, List[Tuple[int, object]]]]
+
+
+def partition(count: int, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split the positions 0..count-1 into contiguous (start, stop) ranges of near equal size.
+    :param count: The number of nodes.
+    :param shards: The number of ranges wanted, reduced if there are fewer nodes.
+    """
+    shards = max(1, min(shards, count))
+    size, extra = divmod(count, shards)
+
+    bounds = []
+    start = 0
+    for shard in range(shards):
+        stop = start + size + (1 if shard < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+
+    return bounds
+
+
+def port_attributes(attributes) -> dict:
+    """Return the edge attributes of a port, without the keys describing the topology."""
+    return {key: value for key, value in attributes.items() if key not in TOPOLOGY_KEYS}
+
+
+class Shard:
+    """
+    The nodes of one worker process and their event calendar.
+
+    Every worker holds a forked copy of the whole network but only computes
+    the nodes in its own range of positions. Messages staged for nodes of other
+    shards are shipped to them at the end of the round.
+    """
+
+    def __init__(self, network, index: int, bounds: List[Tuple[int, int]]):
+        self.network = network
+        self.index = index
+        self.starts = [start for start, _ in bounds]
+
+        start, stop = bounds[index]
+        self.nodes: List[Node] = network.nodes[start:stop]
+
+        self.awake: List[Node] = []
+        self.calendar = WakeCalendar()
+        self.delivery = 0  # Nanoseconds spent delivering since the last profiled round
+
+        # Port attributes as forked, so only those the shard changes are copied back
+        self.initial_ports = [
+            {port: port_attributes(attributes) for port, attributes in node.ports.items()}
+            for node in self.nodes
+        ]
+
+        for node in self.nodes:
+            if node.sleeping:
+                self.calendar.add(node)
+            else:
+                self.awake.append(node)
+
+        if network.tracer is not None:
+            network.tracer.fork(index)
+
+        # Only count the nodes of this shard from now on
+        network.active_nodes = sum(1 for node in self.nodes if not node.terminated)
+
+    def shard_of(self, node: Node) -> int:
+        return bisect_right(self.starts, self.network.positions[node]) - 1
+
+    def next_round(self, round_num: int) -> Optional[int]:
+        """Return the next round in which a node of this shard is awake, if any."""
+        if self.awake:
+            return round_num + 1
+
+        return self.calendar.next_round()
+
+    def deliver(self, inbound: List[Tuple[int, Batch]]):
+        """
+        Deliver the messages of the last round, keeping the sequential order.
+
+        Senders are computed in position order, and shards hold contiguous
+        ranges of positions. So a node receives the messages from lower shards
+        first, then those from its own shard, then those from higher shards.
+        """
+        network = self.network
+        if network.profiler is not None:
+            start = perf_counter_ns()
+
+        for source, batch in inbound:
+            if source < self.index:
+                for position, messages in batch:
+                    network.nodes[position].inbox.extend(messages)
+
+        network.deliver_messages()
+
+        for source, batch in inbound:
+            if source > self.index:
+                for position, messages in batch:
+                    network.nodes[position].inbox.extend(messages)
+
+        if network.profiler is not None:
+            self.delivery += perf_counter_ns() - start
+
+    def compute(self, round_num: int) -> Dict[int, Batch]:
+        """Run one round for the due nodes and return the messages for other shards."""
+        network = self.network
+        network.round_num = round_num
+        profiler = network.profiler
+        if profiler is not None:
+            start = perf_counter_ns()
+
+        due = self.awake
+        waking = self.calendar.pop(round_num)
+        if waking:
+            due = sorted(due + waking, key=network.positions.__getitem__)
+
+        for node in due:
+            node.compute(round_number=round_num)
+
+        if profiler is not None:
+            computed = perf_counter_ns()
+
+        # Take the messages for other shards out of the local staging inboxes
+        outbound: Dict[int, Batch] = {}
+        local = []
+        for node in network.pending_delivery:
+            shard = self.shard_of(node)
+            if shard == self.index:
+                local.append(node)
+            else:
+                outbound.setdefault(shard, []).append(
+                    (network.positions[node], node.staging_inbox)
+                )
+                node.staging_inbox = []
+        network.pending_delivery = local
+
+        self.awake = []
+        for node in due:
+            node.finalize_sleep(round_num)
+
+            if node.sleeping:
+                self.calendar.add(node)
+            else:
+                self.awake.append(node)
+
+        # Delivery covers the messages received at the start of the round and those sent in it
+        if profiler is not None:
+            delivery = self.delivery + perf_counter_ns() - computed
+            profiler.add_round(round_num, len(due), computed - start, delivery)
+            self.delivery = 0
+
+        # The first shard owns the first node, which `end_round` hooks may inspect
+        if self.index == 0:
+            network.end_round(round_num)
+
+        return outbound
+
+    def export_state(
+        self,
+    ) -> Tuple[list, dict, Optional[tuple], Optional[tuple], Optional[dict], Optional[list]]:
+        """
+        Return the state of this shard's nodes and their ports, the network's
+        round state, traffic, profile, the labels of its trace and the
+        attribution of its nodes' awake rounds.
+        """
+        nodes = []
+        for node, initial_ports in zip(self.nodes, self.initial_ports):
+            ports = {}
+            for port, attributes in node.ports.items():
+                initial = initial_ports[port]
+                changed = {
+                    key: value
+                    for key, value in port_attributes(attributes).items()
+                    if key not in initial or initial[key] != value
+                }
+                if changed:
+                    ports[port] = changed
+            nodes.append((node.export_state(), ports))
+
+        round_state = {}
+        if self.index == 0:
+            round_state = {
+                name: getattr(self.network, name) for name in self.network.round_state
+            }
+
+        profile = None
+        if self.network.profiler is not None:
+            profile = self.network.profiler.export()
+
+        labels = None
+        if self.network.tracer is not None:
+            labels = self.network.tracer.finish()
+
+        histograms = None
+        if self.network.attribution is not None:
+            start = self.network.positions[self.nodes[0]] if self.nodes else 0
+            histograms = self.network.attribution.export(start, start + len(self.nodes))
+
+        traffic = None
+        if self.network.traffic is not None:
+            traffic = self.network.traffic.export()
+
+        return nodes, round_state, traffic, profile, labels, histograms
+
+    def run(self, connection):
+        """Serve round commands from the coordinator until told to finish."""
+        while True:
+            command, round_num, inbound = connection.recv()
+            self.deliver(inbound)
+
+            if command == "finish":
+                connection.send(("state", self.export_state()))
+                return
+
+            outbound = self.compute(round_num)
+            connection.send(
+                (
+                    "round",
+                    (outbound, self.next_round(round_num), self.network.active_nodes),
+                )
+            )
+
+
+def _worker(network, index: int, bounds: List[Tuple[int, int]], connection):
+    try:
+        Shard(network, index, bounds).run(connection)
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def _receive(connection):
+    status, payload = connection.recv()
+    if status == "error":
+        raise RuntimeError(f"Worker process failed:\n{payload}")
+    return payload
+
+
+def simulate_multiprocess(network, workers: Optional[int] = None):
+    """
+    Run the simulation with the nodes partitioned across worker processes.
+
+    Workers are forked, so they start from a copy of the network and need
+    nothing to be pickled up front. At each end-of-round barrier they report
+    their messages for other shards and their next awake round. Rounds in
+    which every node sleeps are skipped without a barrier. Once all nodes have
+    terminated, node and port state, traffic, the profile of a profiled
+    network and the awake attribution are copied back into this process, and
+    the trace parts written by the workers are appended to the trace in shard
+    order. Only the port attributes a worker changed are copied back, so with
+    the CSR port table an edge attribute changed by one endpoint keeps that
+    value, and one that both endpoints changed keeps the value written by the
+    endpoint at the later position.
+    :param network: The network to simulate.
+    :param workers: The number of worker processes, defaults to the number of CPUs.
+    """
+    context = multiprocessing.get_context("fork")
+    bounds = partition(len(network.nodes), workers or os.cpu_count() or 1)
+
+    connections = []
+    processes = []
+    for index in range(len(bounds)):
+        parent_end, child_end = context.Pipe()
+        process = context.Process(
+            target=_worker, args=(network, index, bounds, child_end), daemon=True
+        )
+        process.start()
+        child_end.close()
+
+        connections.append(parent_end)
+        processes.append(process)
+
+    try:
+        inbound: List[List[Tuple[int, Batch]]] = [[] for _ in bounds]
+        round_num = 1
+
+        while True:
+            if network.verbose:
+                print(f"\n--- Simulating Round {round_num} ---")
+
+            for connection, messages in zip(connections, inbound):
+                connection.send(("round", round_num, messages))
+
+            inbound = [[] for _ in bounds]
+            next_rounds = []
+            active_nodes = 0
+
+            for source, connection in enumerate(connections):
+                outbound, next_round, shard_active = _receive(connection)
+
+                # Sources are visited in order, so batches arrive sorted by shard
+                for shard, batch in outbound.items():
+                    inbound[shard].append((source, batch))
+
+                if next_round is not None:
+                    next_rounds.append(next_round)
+                active_nodes += shard_active
+
+            network.round_num = round_num
+            if active_nodes == 0:
+                break
+
+            if not next_rounds:
+                raise RuntimeError("Every active node is asleep with no wake round.")
+            round_num = min(next_rounds)
+
+        for connection, messages in zip(connections, inbound):
+            connection.send(("finish", round_num, messages))
+
+        shard_states = [_receive(connection) for connection in connections]
+    finally:
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            process.join()
+
+    for index, ((start, _), state) in enumerate(zip(bounds, shard_states)):
+        nodes, round_state, traffic, profile, labels, histograms = state
+        for node, (state, ports) in zip(network.nodes[start:], nodes):
+            node.import_state(state)
+            for port, attributes in ports.items():
+                node.ports[port].update(attributes)
+
+        for name, value in round_state.items():
+            setattr(network, name, value)
+
+        if traffic is not None:
+            network.traffic.merge(traffic)
+        if profile is not None:
+            network.profiler.merge(profile)
+        if labels is not None:
+            network.tracer.absorb(index, labels)
+        if histograms is not None:
+            network.attribution.merge(start, histograms)
+
+    network.pending_delivery.clear()
+    network.active_nodes = sum(1 for node in network.nodes if not node.terminated)
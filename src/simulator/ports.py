@@ -0,0 +1,235 @@
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Dict, List
+
+# Port keys that describe the topology rather than an edge attribute
+TOPOLOGY_KEYS = ("destination", "destination_port")
+
+# Value of an attribute column for the edges the attribute was never set on
+UNSET = object()
+
+
+class PortTable:
+    """
+    Compact adjacency shared by every node of a network, stored in CSR form.
+
+    The ports of the node at position `u` occupy the slots `offsets[u]` to
+    `offsets[u + 1] - 1`, in port order. For each slot the table stores the
+    position of the neighbour, the neighbour's port for the same edge and the
+    edge's index. Edge attributes are columns indexed by edge, so the state of
+    an edge is stored once and shared by both of its endpoints.
+    """
+
+    def __init__(self, nodes: List, src: List[int], dst: List[int], columns: Dict[str, list]):
+        """
+        Build the table in a single pass over the edges.
+        :param nodes: The nodes of the network, in position order.
+        :param src: The position of the first endpoint of each edge.
+        :param dst: The position of the second endpoint of each edge.
+        :param columns: One list of values per edge attribute, indexed by edge.
+        """
+        n = len(nodes)
+        self.nodes = nodes
+
+        degrees = [0] * n
+        for u in src:
+            degrees[u] += 1
+        for v in dst:
+            degrees[v] += 1
+
+        offsets = array("q", [0]) * (n + 1)
+        for u in range(n):
+            offsets[u + 1] = offsets[u] + degrees[u]
+
+        slots = offsets[n]
+        neighbors = array("q", [0]) * slots
+        reverse_ports = array("q", [0]) * slots
+        edge_ids = array("q", [0]) * slots
+
+        # Ports are numbered in the order edges are added, as with `Network.update_ports`
+        fill = offsets[:n]
+        for edge_id, (u, v) in enumerate(zip(src, dst)):
+            u_slot = fill[u]
+            fill[u] += 1
+            v_slot = fill[v]
+            fill[v] += 1
+
+            neighbors[u_slot] = v
+            reverse_ports[u_slot] = v_slot - offsets[v]
+            edge_ids[u_slot] = edge_id
+
+            neighbors[v_slot] = u
+            reverse_ports[v_slot] = u_slot - offsets[u]
+            edge_ids[v_slot] = edge_id
+
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.reverse_ports = reverse_ports
+        self.edge_ids = edge_ids
+        self.src = array("q", src)
+        self.dst = array("q", dst)
+        self.columns = {key: compact_column(values) for key, values in columns.items()}
+
+    def set_attribute(self, key: str, edge_id: int, value):
+        """
+        Set an attribute of an edge, adding its column if no edge had it yet.
+
+        As with the port dictionaries, an attribute set on one edge is absent
+        from the others rather than None. A typed column that cannot hold the
+        value is turned back into a list.
+        """
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = [UNSET] * len(self.src)
+
+        try:
+            column[edge_id] = value
+        except (TypeError, OverflowError):
+            column = self.columns[key] = column.tolist()
+            column[edge_id] = value
+
+    def attributes(self, edge_id: int) -> List[str]:
+        """Return the attribute keys set on an edge."""
+        return [key for key, column in self.columns.items() if column[edge_id] is not UNSET]
+
+    def ports(self, position: int) -> "NodePorts":
+        """Return the port view of the node at the given position."""
+        start = self.offsets[position]
+        return NodePorts(self, start, self.offsets[position + 1] - start)
+
+
+def compact_column(values: list):
+    """Store an all-integer or all-float column as a typed array, anything else as a list."""
+    if values and all(type(value) is int for value in values):
+        return array("q", values)
+    if values and all(type(value) is float for value in values):
+        return array("d", values)
+    return list(values)
+
+
+class NodePorts(Mapping):
+    """Read-only mapping of a node's port IDs to thin views of its slots in a `PortTable`."""
+
+    __slots__ = ("table", "start", "count")
+
+    def __init__(self, table: PortTable, start: int, count: int):
+        self.table = table
+        self.start = start
+        self.count = count
+
+    def __getitem__(self, port_id: int) -> "PortView":
+        if type(port_id) is not int or not 0 <= port_id < self.count:
+            raise KeyError(port_id)
+        return PortView(self.table, self.start + port_id)
+
+    def __contains__(self, port_id) -> bool:
+        return type(port_id) is int and 0 <= port_id < self.count
+
+    def __iter__(self):
+        return iter(range(self.count))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def route(self, port_id: int):
+        """Return the destination node and the destination's port for a port ID."""
+        slot = self.start + port_id
+        table = self.table
+        return table.nodes[table.neighbors[slot]], table.reverse_ports[slot]
+
+
+class PortView(MutableMapping):
+    """Dictionary-like view of one port, with the same keys as the `Network.update_ports` dictionaries."""
+
+    __slots__ = ("table", "slot")
+
+    def __init__(self, table: PortTable, slot: int):
+        self.table = table
+        self.slot = slot
+
+    def __getitem__(self, key: str):
+        table = self.table
+        if key == "destination":
+            return table.nodes[table.neighbors[self.slot]]
+        if key == "destination_port":
+            return table.reverse_ports[self.slot]
+        value = table.columns[key][table.edge_ids[self.slot]]
+        if value is UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        if key in TOPOLOGY_KEYS:
+            raise TypeError(f"The port's {key} cannot be changed.")
+        self.table.set_attribute(key, self.table.edge_ids[self.slot], value)
+
+    def __delitem__(self, key: str):
+        raise TypeError("Port attributes cannot be removed.")
+
+    def __iter__(self):
+        yield from TOPOLOGY_KEYS
+        yield from self.table.attributes(self.table.edge_ids[self.slot])
+
+    def __len__(self) -> int:
+        edge_id = self.table.edge_ids[self.slot]
+        return len(TOPOLOGY_KEYS) + len(self.table.attributes(edge_id))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class EdgeAttributes(MutableMapping):
+    """Dictionary-like view of the attributes of one edge in a `PortTable`."""
+
+    __slots__ = ("table", "edge_id")
+
+    def __init__(self, table: PortTable, edge_id: int):
+        self.table = table
+        self.edge_id = edge_id
+
+    def __getitem__(self, key: str):
+        value = self.table.columns[key][self.edge_id]
+        if value is UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        self.table.set_attribute(key, self.edge_id, value)
+
+    def __delitem__(self, key: str):
+        raise TypeError("Edge attributes cannot be removed.")
+
+    def __iter__(self):
+        return iter(self.table.attributes(self.edge_id))
+
+    def __len__(self) -> int:
+        return len(self.table.attributes(self.edge_id))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class EdgeList(Sequence):
+    """Sequence of `(u, v, attributes)` edge tuples generated on demand from a `PortTable`."""
+
+    def __init__(self, table: PortTable):
+        self.table = table
+
+    def __getitem__(self, edge_id: int):
+        if isinstance(edge_id, slice):
+            return [self[i] for i in range(*edge_id.indices(len(self)))]
+
+        table = self.table
+        if edge_id < 0:
+            edge_id += len(self)
+        if not 0 <= edge_id < len(self):
+            raise IndexError("edge index out of range")
+
+        return (
+            table.nodes[table.src[edge_id]],
+            table.nodes[table.dst[edge_id]],
+            EdgeAttributes(table, edge_id),
+        )
+
+    def __len__(self) -> int:
+        return len(self.table.src)
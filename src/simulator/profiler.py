@@ -0,0 +1,147 @@
+import threading
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Dict, List, Tuple
+
+from .hooks import wrap_nodes
+
+# (category, name) -> [calls, nanoseconds]
+Counters = Dict[Tuple[str, str], List[int]]
+
+
+class Profiler:
+    """
+    Wall-clock time and call counts of a simulation.
+
+    Rounds are timed by the schedulers, split into computing the due nodes and
+    delivering their messages. Stages and procedure handlers are timed by
+    wrapping the `handle_stage` method and the `PROCEDURES` handlers of the
+    profiled network's nodes for the duration of a run, see `wrap_nodes`, so
+    other networks run the unwrapped code. Stage times include the procedure
+    handlers they call.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.thread_counters: List[Counters] = []  # One table per thread that recorded
+
+        # (round, due nodes, compute nanoseconds, delivery nanoseconds)
+        self.rounds: List[Tuple[int, int, int, int]] = []
+
+    def counters(self) -> Counters:
+        """Return the calling thread's table, so threads never update the same entry."""
+        try:
+            return self.local.counters
+        except AttributeError:
+            counters = self.local.counters = {}
+            with self.lock:
+                self.thread_counters.append(counters)
+            return counters
+
+    def add(self, category: str, name: str, elapsed: int, calls: int = 1):
+        entry = self.counters().setdefault((category, name), [0, 0])
+        entry[0] += calls
+        entry[1] += elapsed
+
+    def add_round(self, round_num: int, due: int, compute: int, delivery: int):
+        """Record the time spent computing the due nodes of a round and delivering their messages."""
+        self.rounds.append((round_num, due, compute, delivery))
+
+    def timed(self, category: str, name: str, function):
+        """Return a wrapper of `function` that records its calls under (category, name)."""
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add(category, name, perf_counter_ns() - start)
+
+        return wrapper
+
+    def timed_stage(self, function):
+        """Return a wrapper of `handle_stage` that records its calls under the stage being handled."""
+        profiler = self
+
+        def wrapper(node, *args, **kwargs):
+            stage = kwargs["stage"] if "stage" in kwargs else args[0]
+            start = perf_counter_ns()
+            try:
+                return function(node, *args, **kwargs)
+            finally:
+                profiler.add("stage", stage.value, perf_counter_ns() - start)
+
+        return wrapper
+
+    @contextmanager
+    def instrument(self, network):
+        """
+        Time the stages and procedure handlers of a network's nodes until the block exits.
+        :param network: The network whose run is profiled.
+        """
+        wrappers = {
+            "handle_stage": self.timed_stage,
+            "PROCEDURES": lambda procedures: {
+                procedure: self.timed("procedure", procedure.value, handler)
+                for procedure, handler in procedures.items()
+            },
+        }
+        with wrap_nodes(network, wrappers):
+            yield self
+
+    def export(self) -> Tuple[Counters, list]:
+        """Return the recorded counters and rounds, to be merged into another profiler."""
+        counters: Counters = {}
+        for thread_counters in self.thread_counters:
+            for key, (calls, elapsed) in thread_counters.items():
+                entry = counters.setdefault(key, [0, 0])
+                entry[0] += calls
+                entry[1] += elapsed
+
+        return counters, self.rounds
+
+    def merge(self, exported: Tuple[Counters, list]):
+        """Add the counters and rounds returned by another profiler's `export`."""
+        counters, rounds = exported
+        for (category, name), (calls, elapsed) in counters.items():
+            self.add(category, name, elapsed, calls)
+
+        # Rounds computed by several processes are added up
+        merged = {round_num: [due, compute, delivery] for round_num, due, compute, delivery in self.rounds}
+        for round_num, due, compute, delivery in rounds:
+            entry = merged.setdefault(round_num, [0, 0, 0])
+            entry[0] += due
+            entry[1] += compute
+            entry[2] += delivery
+        self.rounds = [(round_num, *entry) for round_num, entry in sorted(merged.items())]
+
+    def table(self) -> List[Tuple[str, str, int, float]]:
+        """
+        Return one (category, name, calls, seconds) row per timed item, slowest first.
+
+        The "round" rows add up the compute and delivery time of every round,
+        with one call per simulated round.
+        """
+        counters, rounds = self.export()
+        rows = [
+            ("round", "compute", len(rounds), sum(row[2] for row in rounds) / 1e9),
+            ("round", "delivery", len(rounds), sum(row[3] for row in rounds) / 1e9),
+        ]
+        rows += [
+            (category, name, calls, elapsed / 1e9)
+            for (category, name), (calls, elapsed) in counters.items()
+        ]
+
+        return sorted(rows, key=lambda row: (row[0] != "round", -row[3]))
+
+    def format_table(self) -> str:
+        """Return the table as aligned text."""
+        lines = [f"{'category':<10} {'name':<26} {'calls':>10} {'seconds':>10} {'us/call':>9}"]
+        for category, name, calls, seconds in self.table():
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            lines.append(
+                f"{category:<10} {name:<26} {calls:>10} {seconds:>10.3f} {per_call:>9.2f}"
+            )
+        return "\n".join(lines)
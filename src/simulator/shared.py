@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class Scheduler(Enum):
+    SEQUENTIAL = "Sequential"
+    EVENT_DRIVEN = "Event-Driven"
+    FAST_FORWARD = "Fast-Forward"
+    MULTIPROCESS = "Multi-Process"
+    THREADED = "Threaded"
+
+
+class PortBackend(Enum):
+    DICT = "Dict"
+    CSR = "CSR"
@@ -0,0 +1,80 @@
+import os
+import sys
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+
+from .node import Node
+
+# Below this many due nodes a round is computed inline, as dispatching it would cost more
+MIN_PARALLEL_NODES = 256
+
+# Chunks per worker thread, so that a slow chunk does not hold up the whole round
+CHUNKS_PER_WORKER = 4
+
+
+def gil_enabled() -> bool:
+    """Return whether the interpreter runs with the GIL, under which threads cannot compute in parallel."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+def compute_chunk(nodes: List[Node], round_num: int) -> Tuple[list, list, list]:
+    """
+    Compute and put to sleep a chunk of nodes, buffering the messages they send.
+    :param nodes: The due nodes of the chunk, in position order.
+    :param round_num: The current round.
+    """
+    outbox = []
+    awake = []
+    sleeping = []
+
+    for node in nodes:
+        node.outbox = outbox
+        node.compute(round_number=round_num)
+        node.outbox = None
+
+        node.finalize_sleep(round_num)
+        if node.sleeping:
+            sleeping.append(node)
+        else:
+            awake.append(node)
+
+    return outbox, awake, sleeping
+
+
+class ThreadedCompute:
+    """
+    Compute the due nodes of a round on a thread pool.
+
+    Due nodes are split into contiguous chunks, each with its own outgoing
+    message buffer. The buffers are staged in chunk order at the barrier,
+    which is the order in which the sequential scheduler would stage them.
+    """
+
+    def __init__(self, pool: Executor, workers: Optional[int] = None):
+        self.pool = pool
+        self.chunks = (workers or os.cpu_count() or 1) * CHUNKS_PER_WORKER
+
+    def run(self, network, due: List[Node], round_num: int) -> Tuple[list, list]:
+        """Compute the due nodes, deliver their messages and return the awake and sleeping nodes."""
+        size = -(-len(due) // self.chunks)
+        chunks = [due[start : start + size] for start in range(0, len(due), size)]
+
+        awake = []
+        sleeping = []
+        pending_delivery = network.pending_delivery
+
+        for outbox, chunk_awake, chunk_sleeping in self.pool.map(
+            compute_chunk, chunks, [round_num] * len(chunks)
+        ):
+            for destination, destination_port, message in outbox:
+                if not destination.staging_inbox:
+                    pending_delivery.append(destination)
+                destination.staging_inbox.append((destination_port, message))
+
+            awake.extend(chunk_awake)
+            sleeping.extend(chunk_sleeping)
+
+        network.deliver_messages()
+
+        return awake, sleeping
@@ -0,0 +1,375 @@
+import heapq
+import json
+import os
+import shutil
+import struct
+import threading
+from contextlib import contextmanager
+from enum import Enum
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from .hooks import wrap_nodes
+
+MAGIC = b"MSTTRACE"
+VERSION = 1
+
+# Header: magic, version, record size
+HEADER = struct.Struct("<8sII")
+
+# round, node position, stage, procedure, transmission round, padding, messages in, messages out
+RECORD = struct.Struct("<IIBBBxII")
+
+FIELDS = ("round", "node", "stage", "procedure", "transmission", "messages_in", "messages_out")
+FORMATS = ("<u4", "<u4", "u1", "u1", "u1", "<u4", "<u4")
+OFFSETS = (0, 4, 8, 9, 10, 12, 16)
+
+# Fields holding the code of an Enum member, 0 when there is none
+LABELLED = ("stage", "procedure", "transmission")
+
+# Records buffered by each thread before they are written out
+CHUNK_RECORDS = 65_536
+
+
+def labels_path(path: str) -> str:
+    """Return the path of the JSON file holding the labels of a trace."""
+    return f"{path}.json"
+
+
+def part_path(path: str, index: int) -> str:
+    """Return the path of the part written by a worker process."""
+    return f"{path}.part{index}"
+
+
+class Tracer:
+    """
+    Stream one fixed-width record per awake node per round to a binary file.
+
+    A record holds the round, the node's position in the network, the stage
+    it woke up in, the procedure and transmission round of the schedule item
+    it handled, the messages in its inbox when it woke up and the messages it
+    sent. Like the profiler, it wraps the `compute`, `send_message` and
+    `handle_stage` methods of the traced network's nodes for the duration of a
+    run, see `wrap_nodes`, so other networks run the unwrapped code.
+
+    Each thread packs its records into its own buffer, written out every
+    `chunk_records` records, so memory stays bounded however long the run.
+    Records from one thread are in round order. Those of the threaded and
+    multi-process schedulers are grouped by thread or worker, and can be
+    put in round order with a stable sort on the round. `export_chrome_trace`
+    merges them itself.
+    """
+
+    def __init__(self, path: str, chunk_records: int = CHUNK_RECORDS):
+        self.path = path
+        self.chunk_bytes = chunk_records * RECORD.size
+
+        self.file = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.buffers: List[bytearray] = []  # One buffer per thread that recorded
+
+        self.codes: Dict[int, int] = {}  # id of an Enum member -> code, as members hash slowly
+        self.labels: Dict[str, List[str]] = {}  # field -> label of each code
+
+    def buffer(self) -> bytearray:
+        """Return the calling thread's buffer."""
+        try:
+            return self.local.buffer
+        except AttributeError:
+            buffer = self.local.buffer = bytearray()
+            with self.lock:
+                self.buffers.append(buffer)
+            return buffer
+
+    def code(self, field: str, member: Optional[Enum]) -> int:
+        """Return the code of an Enum member, its position in its class counting from 1."""
+        if member is None:
+            return 0
+
+        code = self.codes.get(id(member))
+        if code is None:
+            members = list(type(member))
+            code = self.codes[id(member)] = members.index(member) + 1
+            self.labels[field] = [""] + [str(item.value) for item in members]
+
+        return code
+
+    def flush(self, buffer: bytearray):
+        with self.lock:
+            self.file.write(buffer)
+        buffer.clear()
+
+    def open(self):
+        # Writes are already chunked, so the file needs no buffer of its own
+        # that a forked worker could inherit
+        self.file = open(self.path, "wb", buffering=0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+
+    def finish(self) -> Dict[str, List[str]]:
+        """Write out every buffer, close the file and return the labels of the codes."""
+        for buffer in self.buffers:
+            if buffer:
+                self.flush(buffer)
+
+        self.file.close()
+        self.file = None
+        return self.labels
+
+    def fork(self, index: int):
+        """Record into a part of its own, in a worker process forked from the one that opened the trace."""
+        self.file = open(part_path(self.path, index), "wb", buffering=0)
+        self.local = threading.local()
+        self.buffers = []
+
+    def absorb(self, index: int, labels: Dict[str, List[str]]):
+        """Append the part written by a worker process and delete it."""
+        path = part_path(self.path, index)
+        with open(path, "rb") as part:
+            shutil.copyfileobj(part, self.file)
+        os.remove(path)
+
+        self.labels.update(labels)
+
+    def traced_compute(self, function, positions: Dict):
+        tracer = self
+        pack = RECORD.pack
+        chunk_bytes = self.chunk_bytes
+
+        def wrapper(node, round_number):
+            if node.sleeping and round_number < node.wake_round:
+                return function(node, round_number)
+
+            local = tracer.local
+            messages_in = len(node.inbox)
+            stage = getattr(node, "stage", None)
+            local.sent = 0
+            local.item = None
+
+            function(node, round_number)
+
+            procedure, transmission = local.item or (None, None)
+            buffer = tracer.buffer()
+            buffer += pack(
+                round_number,
+                positions[node],
+                tracer.code("stage", stage),
+                tracer.code("procedure", procedure),
+                tracer.code("transmission", transmission),
+                messages_in,
+                local.sent,
+            )
+            if len(buffer) >= chunk_bytes:
+                tracer.flush(buffer)
+
+        return wrapper
+
+    def traced_send(self, function):
+        tracer = self
+
+        def wrapper(node, *args, **kwargs):
+            function(node, *args, **kwargs)
+            tracer.local.sent += 1
+
+        return wrapper
+
+    def traced_stage(self, function):
+        """Return a wrapper of `handle_stage` that notes the schedule item about to be handled."""
+        tracer = self
+
+        def wrapper(node, *args, **kwargs):
+            if node.schedule:
+                _, procedure, transmission = node.schedule[0]
+                tracer.local.item = (procedure, transmission)
+            return function(node, *args, **kwargs)
+
+        return wrapper
+
+    @contextmanager
+    def record(self, network):
+        """
+        Trace the nodes of a network until the block exits, then write the labels file.
+        :param network: The network whose run is traced.
+        """
+        wrappers = {
+            "compute": lambda function: self.traced_compute(function, network.positions),
+            "send_message": self.traced_send,
+            "handle_stage": self.traced_stage,
+        }
+
+        self.codes.clear()
+        self.labels = {}
+        self.open()
+
+        try:
+            with wrap_nodes(network, wrappers):
+                yield self
+        finally:
+            labels = self.finish()
+            node_ids = [
+                node.node_id if isinstance(node.node_id, (int, str)) else repr(node.node_id)
+                for node in network.nodes
+            ]
+            with open(labels_path(self.path), "w") as file:
+                json.dump({"node_ids": node_ids, **labels}, file)
+
+
+def read_trace(path: str, mmap: bool = False) -> Tuple["numpy.ndarray", Dict[str, list]]:
+    """
+    Load a trace written by a `Tracer` as a NumPy structured array and its labels.
+
+    The array has one field per column of the records. The labels map the
+    `node` field to node IDs and the `stage`, `procedure` and `transmission`
+    codes to their Enum values, with "" for code 0.
+    :param path: The path of the trace.
+    :param mmap: Map the file into memory instead of reading it, for traces larger than memory.
+    """
+    import numpy
+
+    dtype = numpy.dtype(
+        {"names": FIELDS, "formats": FORMATS, "offsets": OFFSETS, "itemsize": RECORD.size}
+    )
+
+    with open(path, "rb") as file:
+        magic, version, size = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or size != RECORD.size:
+        raise ValueError(f"{path} is not a version {VERSION} trace.")
+
+    # NumPy cannot map an empty range
+    if mmap and os.path.getsize(path) > HEADER.size:
+        records = numpy.memmap(path, dtype=dtype, mode="r", offset=HEADER.size)
+    else:
+        records = numpy.fromfile(path, dtype=dtype, offset=HEADER.size)
+
+    labels = {field: [""] for field in LABELLED}
+    with open(labels_path(path)) as file:
+        labels.update(json.load(file))
+
+    return records, labels
+
+
+def round_runs(records, chunk_records: int = CHUNK_RECORDS) -> List[Tuple[int, int]]:
+    """
+    Split the records of a trace into the (start, stop) ranges in which rounds never decrease.
+
+    A trace written by one thread is a single run. Those of the threaded and
+    multi-process schedulers hold one run per chunk of records written out
+    by a thread, or per worker.
+    :param records: The records returned by `read_trace`.
+    :param chunk_records: The number of records read at a time.
+    """
+    import numpy
+
+    starts = [0]
+    previous = None
+    for begin in range(0, len(records), chunk_records):
+        # Signed, so that a decrease shows as a negative difference
+        rounds = records["round"][begin : begin + chunk_records].astype(numpy.int64)
+        if previous is not None and rounds[0] < previous:
+            starts.append(begin)
+        starts.extend((numpy.flatnonzero(numpy.diff(rounds) < 0) + begin + 1).tolist())
+        previous = rounds[-1]
+
+    return list(zip(starts, starts[1:] + [len(records)]))
+
+
+def _rows(records, start: int, stop: int, chunk_records: int):
+    """Yield the records from start to stop as tuples of the fields, reading a chunk at a time."""
+    for begin in range(start, stop, chunk_records):
+        chunk = records[begin : min(begin + chunk_records, stop)]
+        yield from zip(*(chunk[field].tolist() for field in FIELDS))
+
+
+def export_chrome_trace(path: str, output: str, chunk_records: int = CHUNK_RECORDS):
+    """
+    Convert a trace into Chrome trace-event JSON, for Perfetto or chrome://tracing.
+
+    Each node is a track, named by its ID. Each stage is a span that runs from
+    the first to the end of the last round in which the node was awake in it.
+    Each awake round is a slice inside it, named by the procedure of the
+    schedule item handled, with its transmission round and messages as
+    arguments. Rounds are the time axis, with one round shown as one
+    microsecond. The records are read in chunks and the events are written
+    as they are made, so only a few values per node are held in memory.
+    Traces of the threaded and multi-process schedulers are merged into
+    round order from their runs on the way, see `round_runs`.
+    :param path: The path of the trace.
+    :param output: The path of the JSON file to write.
+    :param chunk_records: The number of records read at a time.
+    """
+    records, labels = read_trace(path, mmap=True)
+
+    runs = round_runs(records, chunk_records)
+    if len(runs) == 1:
+        rows = _rows(records, 0, len(records), chunk_records)
+    else:
+        # Each run holds its share of a chunk in memory while they are merged
+        step = max(1, chunk_records // len(runs))
+        rows = heapq.merge(
+            *(_rows(records, start, stop, step) for start, stop in runs),
+            key=itemgetter(0),
+        )
+
+    # Names are escaped once, as they are written for every event
+    stages, procedures, transmissions = (
+        [json.dumps(label or "-") for label in labels[field]] for field in LABELLED
+    )
+    procedures[0] = json.dumps("Entry")  # Rounds in which no schedule item was handled
+
+    n = len(labels["node_ids"])
+    stage = [0] * n  # Stage of the open span of each node
+    last = [0] * n  # Last round of the open span of each node, 0 when none is open
+
+    with open(output, "w") as file:
+        file.write('{"displayTimeUnit": "ns", "traceEvents": [\n')
+        file.write('{"name": "process_name", "ph": "M", "pid": 0, "args": {"name": "Nodes"}}')
+        for node, node_id in enumerate(labels["node_ids"]):
+            file.write(
+                f',\n{{"name": "thread_name", "ph": "M", "pid": 0, "tid": {node},'
+                f' "args": {{"name": {json.dumps(f"Node {node_id}")}}}}}'
+                f',\n{{"name": "thread_sort_index", "ph": "M", "pid": 0, "tid": {node},'
+                f' "args": {{"sort_index": {node}}}}}'
+            )
+
+        events = []
+        for round_num, node, stage_code, procedure, transmission, received, sent in rows:
+            if round_num <= last[node]:
+                raise ValueError(
+                    f"The trace holds more than one record of node {labels['node_ids'][node]}"
+                    f" in round {round_num}."
+                )
+
+            if stage_code != stage[node] or not last[node]:
+                if last[node]:
+                    events.append(
+                        f'{{"ph": "E", "ts": {last[node] + 1}, "pid": 0, "tid": {node}}}'
+                    )
+                events.append(
+                    f'{{"name": {stages[stage_code]}, "cat": "stage", "ph": "B",'
+                    f' "ts": {round_num}, "pid": 0, "tid": {node}}}'
+                )
+                stage[node] = stage_code
+
+            last[node] = round_num
+            events.append(
+                f'{{"name": {procedures[procedure]}, "cat": "procedure", "ph": "X",'
+                f' "ts": {round_num}, "dur": 1, "pid": 0, "tid": {node},'
+                f' "args": {{"transmission": {transmissions[transmission]},'
+                f' "messages_in": {received}, "messages_out": {sent}}}}}'
+            )
+
+            if len(events) >= chunk_records:
+                file.write(",\n")
+                file.write(",\n".join(events))
+                events.clear()
+
+        if events:
+            file.write(",\n")
+            file.write(",\n".join(events))
+
+        # Close the spans still open at the end of the run
+        for node, round_num in enumerate(last):
+            if round_num:
+                file.write(f',\n{{"ph": "E", "ts": {round_num + 1}, "pid": 0, "tid": {node}}}')
+
+        file.write("\n]}\n")
@@ -0,0 +1,93 @@
+import threading
+from typing import Dict, Hashable, List, Tuple
+
+# round -> [messages, bits]
+Rounds = Dict[int, List[int]]
+
+# (phase, stage) -> [messages, bits]
+Stages = Dict[Tuple[int, Hashable], List[int]]
+
+
+class Traffic:
+    """
+    Messages and bits sent in each round, and in each stage of each phase, of a simulation.
+
+    Every thread that sends adds to its own tables, so the threaded scheduler
+    never updates the same entry from two threads. The tables are added up
+    when the totals are read.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.thread_rounds: List[Rounds] = []
+        self.thread_stages: List[Stages] = []
+
+    def rounds(self) -> Rounds:
+        """Return the calling thread's table of rounds."""
+        try:
+            return self.local.rounds
+        except AttributeError:
+            rounds = self.local.rounds = {}
+            with self.lock:
+                self.thread_rounds.append(rounds)
+            return rounds
+
+    def stages(self) -> Stages:
+        """Return the calling thread's table of stages."""
+        try:
+            return self.local.stages
+        except AttributeError:
+            stages = self.local.stages = {}
+            with self.lock:
+                self.thread_stages.append(stages)
+            return stages
+
+    def add(self, round_num: int, bits: int, messages: int = 1):
+        rounds = self.rounds()
+        entry = rounds.get(round_num)
+        if entry is None:
+            rounds[round_num] = [messages, bits]
+        else:
+            entry[0] += messages
+            entry[1] += bits
+
+    def add_stage(self, phase: int, stage: Hashable, bits: int, messages: int = 1):
+        stages = self.stages()
+        entry = stages.get((phase, stage))
+        if entry is None:
+            stages[(phase, stage)] = [messages, bits]
+        else:
+            entry[0] += messages
+            entry[1] += bits
+
+    @staticmethod
+    def _total(tables: list) -> dict:
+        totals = {}
+        for table in tables:
+            for key, (messages, bits) in table.items():
+                entry = totals.setdefault(key, [0, 0])
+                entry[0] += messages
+                entry[1] += bits
+        return totals
+
+    def export(self) -> Tuple[Rounds, Stages]:
+        """
+        Return the messages and bits of every round in which something was
+        sent, in round order, and those of every stage of every phase.
+        """
+        rounds = self._total(self.thread_rounds)
+        return dict(sorted(rounds.items())), self._total(self.thread_stages)
+
+    def merge(self, exported: Tuple[Rounds, Stages]):
+        """Add the rounds and stages returned by another table's `export`."""
+        rounds, stages = exported
+        for round_num, (messages, bits) in rounds.items():
+            self.add(round_num, bits, messages)
+        for (phase, stage), (messages, bits) in stages.items():
+            self.add_stage(phase, stage, bits, messages)
+
+    def clear(self):
+        with self.lock:
+            for table in self.thread_rounds + self.thread_stages:
+                table.clear()
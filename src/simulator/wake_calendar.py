@@ -0,0 +1,33 @@
+import heapq
+from typing import Dict, List, Optional
+
+from .node import Node
+
+
+class WakeCalendar:
+    """Sleeping nodes filed under the round in which they wake up."""
+
+    def __init__(self):
+        self.buckets: Dict[int, List[Node]] = {}
+        self.rounds: List[int] = []  # Heap of the keys of `buckets`
+
+    def add(self, node: Node):
+        """File a sleeping node under its wake round."""
+        bucket = self.buckets.get(node.wake_round)
+        if bucket is None:
+            self.buckets[node.wake_round] = [node]
+            heapq.heappush(self.rounds, node.wake_round)
+        else:
+            bucket.append(node)
+
+    def pop(self, round_num: int) -> Optional[List[Node]]:
+        """Remove and return the nodes waking up in the given round, if any."""
+        return self.buckets.pop(round_num, None)
+
+    def next_round(self) -> Optional[int]:
+        """Return the earliest round in which a filed node wakes up, if any."""
+        rounds = self.rounds
+        while rounds and rounds[0] not in self.buckets:
+            heapq.heappop(rounds)
+
+        return rounds[0] if rounds else None